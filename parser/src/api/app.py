@@ -3,11 +3,13 @@ from litestar.openapi.config import OpenAPIConfig
 
 from api.exceptions import exception_to_http_response
 from api.routes import ProblemController
+from infrastructure.archive import get_archive
 from infrastructure.parsers.errors import (
     LeetCodeAPIError,
     PaidProblemError,
     ProblemNotFoundError,
 )
+from infrastructure.tracing import tracing_enabled, tracing_middleware
 
 
 def create_app() -> Litestar:
@@ -23,10 +25,16 @@ def create_app() -> Litestar:
         description="API for fetching LeetCode problem details via GraphQL",
     )
 
+    # Continues traces started by the RAG service (W3C traceparent header).
+    middleware = [tracing_middleware()] if tracing_enabled() else []
+
     app = Litestar(
         route_handlers=[ProblemController],
         exception_handlers=exception_handlers,
         openapi_config=openapi_config,
+        middleware=middleware,
+        # Opens the GraphQL archive up front, so a bad ARCHIVE_MODE fails at boot.
+        on_startup=[get_archive],
     )
 
     return app
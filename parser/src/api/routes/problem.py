@@ -2,7 +2,8 @@ from litestar import Controller, post
 from litestar.status_codes import HTTP_200_OK
 from loguru import logger
 
-from api.schemas import ProblemRequest, ProblemResponse
+from api.schemas import ProblemRequest
+from domain.models.problem import Problem
 from services.problem import get_problem
 
 
@@ -10,17 +11,8 @@ class ProblemController(Controller):
     path = "/problem"
 
     @post("/", status_code=HTTP_200_OK)
-    async def fetch_problem(self, data: ProblemRequest) -> ProblemResponse:
+    async def fetch_problem(self, data: ProblemRequest) -> Problem:
         logger.debug(f"API request for problem slug: {data.slug}")
 
-        problem = await get_problem(data.slug)
-
-        return ProblemResponse(
-            problem_id=problem.problem_id,
-            slug=problem.slug,
-            title=problem.title,
-            difficulty=problem.difficulty,
-            tags=problem.tags,
-            statement=problem.statement,
-            editorial=problem.editorial,
-        )
+        # Litestar encodes the dataclass with msgspec; no intermediate model.
+        return await get_problem(data.slug)
@@ -1,3 +1,3 @@
-from api.schemas.problem import ErrorResponse, ProblemRequest, ProblemResponse
+from api.schemas.problem import ErrorResponse, ProblemRequest
 
-__all__ = ["ErrorResponse", "ProblemRequest", "ProblemResponse"]
+__all__ = ["ErrorResponse", "ProblemRequest"]
@@ -0,0 +1,123 @@
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+from functools import cache
+from pathlib import Path
+
+from loguru import logger
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+DATA_FILE = "graphql.zst"
+INDEX_FILE = "index.jsonl"
+COMPRESSION_LEVEL = 3
+
+
+def archive_key(query: str, variables: dict) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(query.encode())
+    h.update(b"\0")
+    h.update(json.dumps(variables, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+# Append-only archive of raw GraphQL responses.
+#
+#   graphql.zst  — one independent zstd frame per response, so any record can be
+#                  decompressed on its own
+#   index.jsonl  — {"key", "offset", "length", "variables"} per record; a line is
+#                  written only after its frame is flushed, so the index doubles
+#                  as the commit log (a torn tail frame is never referenced)
+#
+# Re-recording a key appends a new frame; the last index entry wins.
+class GraphQLArchive:
+    def __init__(self, path: str | Path, mode: str) -> None:
+        import zstandard
+
+        self.path = Path(path)
+        self.mode = mode
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._data_path = self.path / DATA_FILE
+        self._index_path = self.path / INDEX_FILE
+        self._data_path.touch()
+        self._index_path.touch()
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._index: dict[str, tuple[int, int]] = {}
+        self._mmap: mmap.mmap | None = None
+        self._load_index()
+        if mode == REPLAY:
+            self._map()
+
+    def _load_index(self):
+        with open(self._index_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                entry = json.loads(line)
+                self._index[entry["key"]] = (entry["offset"], entry["length"])
+
+    def _map(self):
+        if self._data_path.stat().st_size == 0:
+            return
+        with open(self._data_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._index.get(key)
+        if entry is None or self._mmap is None:
+            return None
+        offset, length = entry
+        return self._decompressor.decompress(self._mmap[offset : offset + length])
+
+    # Blocking (compress, flock, fsync): call it through asyncio.to_thread. A
+    # ZstdCompressor is not safe to share between threads, so each put makes its own.
+    def put(self, key: str, variables: dict, raw: bytes):
+        import zstandard
+
+        frame = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(raw)
+        with open(self.path / "write.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(self._data_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+            entry = {
+                "key": key,
+                "offset": offset,
+                "length": len(frame),
+                "variables": variables,
+            }
+            with open(self._index_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        self._index[key] = (offset, len(frame))
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+@cache
+def get_archive() -> GraphQLArchive | None:
+    mode = os.getenv("ARCHIVE_MODE", OFF).lower()
+    if mode == OFF:
+        return None
+    if mode not in (RECORD, REPLAY):
+        raise ValueError(
+            f"ARCHIVE_MODE must be one of off, record, replay; got {mode!r}"
+        )
+    path = os.getenv("ARCHIVE_PATH", "data/archive")
+    archive = GraphQLArchive(path, mode)
+    logger.info(f"GraphQL archive in {mode} mode: {path} ({len(archive)} records)")
+    return archive
@@ -1,7 +1,15 @@
+import asyncio
+import json
+
 import httpx
 from loguru import logger
 
-from infrastructure.parsers.errors import LeetCodeAPIError, ProblemNotFoundError
+from infrastructure.archive import REPLAY, archive_key, get_archive
+from infrastructure.parsers.errors import (
+    ArchiveMissError,
+    LeetCodeAPIError,
+    ProblemNotFoundError,
+)
 
 LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
 
@@ -45,14 +53,25 @@ class LeetCodeClient:
         }
 
     async def _graphql(self, query: str, variables: dict) -> dict:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                LEETCODE_GRAPHQL_URL,
-                json={"query": query, "variables": variables},
-                headers=self._headers,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        archive = get_archive()
+        key = archive_key(query, variables)
+        if archive is not None and archive.mode == REPLAY:
+            raw = archive.get(key)
+            if raw is None:
+                raise ArchiveMissError(f"Not in archive: {variables}")
+            data = json.loads(raw)
+        else:
+            async with httpx.AsyncClient(timeout=30) as client:
+                resp = await client.post(
+                    LEETCODE_GRAPHQL_URL,
+                    json={"query": query, "variables": variables},
+                    headers=self._headers,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+            # Recorded before the error check, so replay reproduces GraphQL errors too.
+            if archive is not None:
+                await asyncio.to_thread(archive.put, key, variables, resp.content)
 
         if "errors" in data:
             errors = data["errors"]
@@ -12,3 +12,7 @@ class PaidProblemError(LeetCodeError):
 
 class LeetCodeAPIError(LeetCodeError):
     pass
+
+
+class ArchiveMissError(ProblemNotFoundError):
+    pass
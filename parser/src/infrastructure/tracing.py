@@ -0,0 +1,32 @@
+import os
+from functools import cache
+
+from litestar.middleware.base import DefineMiddleware
+from loguru import logger
+
+
+def tracing_enabled() -> bool:
+    return os.getenv("OTEL_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+# Cached: create_app() can run more than once per process, the provider must not.
+@cache
+def tracing_middleware() -> DefineMiddleware:
+    # Optional dependencies: uv sync --extra tracing
+    from litestar.contrib.opentelemetry import OpenTelemetryConfig
+    from opentelemetry import trace
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    service_name = os.getenv("OTEL_SERVICE_NAME", "leetcode-parser")
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    # Child spans for the LeetCode GraphQL calls.
+    HTTPXClientInstrumentor().instrument()
+
+    logger.info(f"OpenTelemetry tracing enabled as {service_name}")
+    return OpenTelemetryConfig(tracer_provider=provider).middleware
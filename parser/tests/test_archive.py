@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pytest
+
+from infrastructure import archive as archive_module
+from infrastructure.archive import (
+    RECORD,
+    REPLAY,
+    GraphQLArchive,
+    archive_key,
+    get_archive,
+)
+from infrastructure.leetcode_client import LeetCodeClient
+from infrastructure.parsers.errors import ArchiveMissError
+
+# GraphQLArchive needs the `archive` extra.
+pytest.importorskip("zstandard")
+
+
+def _response(slug: str) -> bytes:
+    return json.dumps({"data": {"question": {"titleSlug": slug}}}).encode()
+
+
+def test_archive_key_ignores_variable_order():
+    assert archive_key("q", {"a": 1, "b": 2}) == archive_key("q", {"b": 2, "a": 1})
+    assert archive_key("q", {"a": 1}) != archive_key("other", {"a": 1})
+
+
+def test_put_then_replay(tmp_path):
+    recorder = GraphQLArchive(tmp_path, RECORD)
+    recorder.put("k1", {"titleSlug": "two-sum"}, _response("two-sum"))
+    recorder.put("k2", {"titleSlug": "add-two-numbers"}, _response("add-two-numbers"))
+    recorder.close()
+
+    replay = GraphQLArchive(tmp_path, REPLAY)
+    assert len(replay) == 2
+    assert "k1" in replay
+    assert replay.get("k1") == _response("two-sum")
+    assert replay.get("k2") == _response("add-two-numbers")
+    assert replay.get("missing") is None
+    replay.close()
+
+
+def test_rerecorded_key_last_entry_wins(tmp_path):
+    recorder = GraphQLArchive(tmp_path, RECORD)
+    recorder.put("k", {}, b'{"data": 1}')
+    recorder.put("k", {}, b'{"data": 2}')
+
+    replay = GraphQLArchive(tmp_path, REPLAY)
+    assert len(replay) == 1
+    assert replay.get("k") == b'{"data": 2}'
+
+
+def test_torn_index_tail_is_ignored(tmp_path):
+    recorder = GraphQLArchive(tmp_path, RECORD)
+    recorder.put("k", {}, b'{"data": 1}')
+    with open(tmp_path / archive_module.INDEX_FILE, "a") as f:
+        f.write('{"key": "torn", "offset": 0')
+
+    replay = GraphQLArchive(tmp_path, REPLAY)
+    assert len(replay) == 1
+    assert replay.get("k") == b'{"data": 1}'
+
+
+def test_empty_archive_replays_nothing(tmp_path):
+    replay = GraphQLArchive(tmp_path, REPLAY)
+    assert len(replay) == 0
+    assert replay.get("k") is None
+
+
+async def test_concurrent_puts_from_threads(tmp_path):
+    recorder = GraphQLArchive(tmp_path, RECORD)
+    responses = {f"k{i}": _response(f"problem-{i}") * (i + 1) for i in range(32)}
+    await asyncio.gather(
+        *(
+            asyncio.to_thread(recorder.put, key, {"i": key}, raw)
+            for key, raw in responses.items()
+        )
+    )
+
+    replay = GraphQLArchive(tmp_path, REPLAY)
+    assert len(replay) == len(responses)
+    for key, raw in responses.items():
+        assert replay.get(key) == raw
+
+
+def test_get_archive_modes(tmp_path, monkeypatch):
+    get_archive.cache_clear()
+    monkeypatch.setenv("ARCHIVE_PATH", str(tmp_path))
+    try:
+        monkeypatch.setenv("ARCHIVE_MODE", "off")
+        assert get_archive() is None
+        get_archive.cache_clear()
+
+        monkeypatch.setenv("ARCHIVE_MODE", "Record")
+        archive = get_archive()
+        assert archive is not None and archive.mode == RECORD
+        get_archive.cache_clear()
+
+        monkeypatch.setenv("ARCHIVE_MODE", "sometimes")
+        with pytest.raises(ValueError):
+            get_archive()
+    finally:
+        get_archive.cache_clear()
+
+
+async def test_client_replays_from_archive(tmp_path, monkeypatch):
+    recorder = GraphQLArchive(tmp_path, RECORD)
+    client = LeetCodeClient()
+    query = "query questionTitle($titleSlug: String!) { question { titleSlug } }"
+    recorder.put(
+        archive_key(query, {"titleSlug": "two-sum"}),
+        {"titleSlug": "two-sum"},
+        _response("two-sum"),
+    )
+    replay = GraphQLArchive(tmp_path, REPLAY)
+    monkeypatch.setattr("infrastructure.leetcode_client.get_archive", lambda: replay)
+
+    data = await client._graphql(query, {"titleSlug": "two-sum"})
+    assert data == {"question": {"titleSlug": "two-sum"}}
+    with pytest.raises(ArchiveMissError):
+        await client._graphql(query, {"titleSlug": "missing"})
@@ -0,0 +1,28 @@
+import statistics
+import time
+from collections.abc import Callable
+
+
+def measure(
+    fn: Callable[[], object], repeat: int = 200, warmup: int = 10
+) -> dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[int(len(samples) * 0.95) - 1] * 1000,
+    }
+
+
+def report(name: str, stats: dict[str, float], budget_ms: float | None = None) -> None:
+    line = f"{name:<40} median {stats['median_ms']:8.3f} ms   p95 {stats['p95_ms']:8.3f} ms"
+    if budget_ms is not None:
+        verdict = "ok" if stats["median_ms"] < budget_ms else "OVER BUDGET"
+        line += f"   budget {budget_ms} ms: {verdict}"
+    print(line)
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from src import embedder, indexer  # noqa: E402
+from src.config import get_settings  # noqa: E402
+from src.models import ParserProblem  # noqa: E402
+
+TEXTS = 3000
+CHUNK = (
+    "Given an array of integers nums and an integer target, return indices of the two numbers. "
+    * 22
+)
+# Simulated API: fixed round-trip plus time proportional to batch tokens.
+LATENCY_S = 0.15
+SECONDS_PER_MTOK = 2.0
+DIM = 8
+# Ingest: problems sized like the real corpus (~50 chunks each).
+PROBLEMS = 60
+SENTENCE = "Sort the intervals by start, then sweep once and merge any that overlap. "
+
+
+class _FakeEmbeddings:
+    async def create(self, input: list[str], model: str):
+        tokens = sum(embedder.count_tokens(t) for t in input)
+        await asyncio.sleep(LATENCY_S + tokens * SECONDS_PER_MTOK / 1_000_000)
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[float(len(t))] * DIM) for t in input],
+            usage=SimpleNamespace(total_tokens=tokens),
+        )
+
+
+async def _run(concurrency: int, batch_tokens: int, texts: list[str]) -> float:
+    settings = get_settings()
+    settings.EMBEDDING_CONCURRENCY = concurrency
+    settings.EMBEDDING_BATCH_TOKENS = batch_tokens
+    embedder._inflight = None
+    start = time.perf_counter()
+    vectors = await embedder.embed_texts(texts)
+    elapsed = time.perf_counter() - start
+    assert [v[0] for v in vectors] == [float(len(t)) for t in texts], (
+        "output out of input order"
+    )
+    return elapsed
+
+
+def _problems() -> list[ParserProblem]:
+    return [
+        ParserProblem(
+            problem_id=i,
+            slug=f"problem-{i}",
+            title=f"Problem {i}",
+            difficulty="Medium",
+            statement=SENTENCE * 30,
+            editorial=SENTENCE * (1300 + i % 7 * 20),
+        )
+        for i in range(PROBLEMS)
+    ]
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+# The ingest path with PostgreSQL, the vector store and neighbors stubbed out, so only
+# chunking and embedding are timed: one problem per call (one /problems/load each)
+# versus one index_problems call (/problems/load/batch).
+async def _ingest(concurrency: int, bulk: bool, problems: list[ParserProblem]) -> float:
+    settings = get_settings()
+    settings.EMBEDDING_CONCURRENCY = concurrency
+    embedder._inflight = None
+    start = time.perf_counter()
+    if bulk:
+        await indexer.index_problems(problems)
+    else:
+        for pp in problems:
+            await indexer.index_problem(pp)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    embedder._client = SimpleNamespace(embeddings=_FakeEmbeddings())  # type: ignore[assignment]
+    texts = [CHUNK[: 1000 + (i * 37) % 1000] for i in range(TEXTS)]
+    batches, tokens = embedder.plan_batches(
+        texts, get_settings().EMBEDDING_BATCH_TOKENS
+    )
+    print(
+        f"{TEXTS} texts, {tokens} tokens, {len(batches)} batches (simulated API: {LATENCY_S * 1000:.0f} ms + {SECONDS_PER_MTOK} s/Mtok)"
+    )
+
+    baseline = None
+    for concurrency in (1, 2, 4, 8):
+        elapsed = asyncio.run(
+            _run(concurrency, get_settings().EMBEDDING_BATCH_TOKENS, texts)
+        )
+        baseline = baseline or elapsed
+        print(
+            f"{'concurrency ' + str(concurrency):<40} wall {elapsed:7.2f} s   "
+            f"{tokens / elapsed:9.0f} tokens/s   speedup {baseline / elapsed:4.1f}x"
+        )
+
+    indexer.upsert_problem = _noop  # type: ignore[assignment]
+    indexer.update_neighbors = _noop  # type: ignore[assignment]
+    indexer.qdrant_upsert_chunks = lambda chunks, vectors: None  # type: ignore[assignment]
+    problems = _problems()
+    chunks = sum(len(indexer.chunk_problem(indexer._problem(pp))) for pp in problems)
+    print(f"\ningest: {PROBLEMS} problems, {chunks} chunks")
+    baseline = None
+    for concurrency, bulk in ((1, False), (4, False), (1, True), (4, True), (8, True)):
+        elapsed = asyncio.run(_ingest(concurrency, bulk, problems))
+        baseline = baseline or elapsed
+        label = "index_problems" if bulk else "index_problem per problem"
+        print(
+            f"{label + ', concurrency ' + str(concurrency):<40} wall {elapsed:7.2f} s   "
+            f"speedup {baseline / elapsed:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+import httpx
+
+QUERIES = [
+    "find two numbers that add up to target",
+    "longest substring without repeating characters",
+    "shortest path in a weighted graph",
+    "sliding window maximum",
+    "merge overlapping intervals",
+    "detect a cycle in a linked list",
+    "dynamic programming on subsequences",
+    "binary search on the answer",
+]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    args,
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+):
+    queries = itertools.cycle(QUERIES)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if args.endpoint == "search":
+                resp = await client.post(
+                    "/search", json={"query": next(queries), "limit": 10}
+                )
+            elif args.endpoint == "statement":
+                resp = await client.get(f"/problems/{args.problem_id}/statement")
+            else:
+                resp = await client.get("/problems", params={"limit": 50})
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            errors.append(1)
+
+
+async def run(args) -> None:
+    latencies: list[float] = []
+    errors: list[int] = []
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=30
+    ) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                _worker(client, args, deadline, latencies, errors)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    qps = len(latencies) / elapsed
+    p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+    print(
+        f"{args.endpoint:<10} concurrency {args.concurrency:>4}  "
+        f"{qps:8.1f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  errors {len(errors)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.http_load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument(
+        "--endpoint", choices=["search", "problems", "statement"], default="search"
+    )
+    parser.add_argument("--problem-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
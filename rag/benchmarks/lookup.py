@@ -0,0 +1,77 @@
+import random
+
+from src.lookup import LookupIndex, normalize
+
+from ._timing import measure, report
+
+N = 3500
+# Roughly LeetCode's title vocabulary: a few very common words and a long tail.
+COMMON = "array sum tree binary string number of the in a to and ii with maximum minimum".split()
+WORDS = (
+    "two search linked list merge interval path graph valid palindrome substring subarray "
+    "matrix word ladder course schedule island count sort k closest points stock buy sell "
+    "iii iv longest increasing sequence median sliding window cache design trie kth largest "
+    "rotate image spiral jump game unique paths climbing stairs edit distance color partition "
+    "permutation combination subset letter phone parentheses generate reverse integer roman "
+    "container water trapping rain regular expression wildcard matching anagram group encode "
+    "decode serialize deserialize ancestor lowest common level order traversal zigzag depth "
+    "diameter balanced symmetric flatten populate next pointer clone connected components "
+    "network delay time cheapest flights stops alien dictionary topological redundant "
+    "connection accounts merge swim rising reconstruct itinerary min cost connect all "
+    "house robber decode ways coin change product except self contains duplicate missing "
+    "happy ugly perfect squares power pow divide multiply add strings bits hamming weight "
+    "gas station candy task scheduler meeting rooms insert non overlapping intervals burst "
+    "balloons frog cross odd even first bad version peak element find duplicate kids"
+).split()
+# Query -> median budget in ms. A query of 3+ characters with fewer than `limit`
+# prefix hits also scores a few hundred trigram candidates, which is the slow path:
+# "sliding win" matches no title start in this corpus and goes fuzzy too.
+QUERIES = {
+    "id": ("1234", 0.2),
+    "prefix short": ("s", 0.2),
+    "prefix word": ("sliding win", 0.5),
+    "fuzzy typo": ("longset palindrom", 0.5),
+}
+
+
+def _problems() -> list[tuple[int, str, str]]:
+    rng = random.Random(0)
+    problems = []
+    for i in range(1, N + 1):
+        words = [
+            rng.choice(COMMON if rng.random() < 0.3 else WORDS)
+            for _ in range(rng.randint(2, 6))
+        ]
+        title = " ".join(words).title()
+        problems.append((i, normalize(title).replace(" ", "-"), title))
+    return problems
+
+
+# What a lookup costs without an index: a case-insensitive scan over every title.
+def _scan(
+    problems: list[tuple[int, str, str]], query: str, limit: int = 10
+) -> list[int]:
+    q = query.lower()
+    return [i for i, slug, title in problems if q in title.lower() or q in slug][:limit]
+
+
+def main() -> None:
+    problems = _problems()
+    index = LookupIndex()
+    stats = measure(
+        lambda: index.load((i, slug, title, "Medium") for i, slug, title in problems),
+        repeat=20,
+    )
+    report(f"build n={N}", stats)
+    stats = measure(lambda: index.add(17, "two-sum-ii", "Two Sum II", "Medium"))
+    report("add one", stats)
+
+    stats = measure(lambda: _scan(problems, "sliding win"))
+    report("linear scan", stats)
+    for name, (query, budget_ms) in QUERIES.items():
+        stats = measure(lambda: index.lookup(query), repeat=2000)
+        report(f"lookup {name}", stats, budget_ms)
+
+
+if __name__ == "__main__":
+    main()
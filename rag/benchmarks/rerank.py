@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.rerank import mmr, mmr_rerank
+
+from ._timing import measure, report
+
+DIM = 1536
+BUDGET_MS = 1.0
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(DIM).astype(np.float32)
+    for n in (50, 200):
+        candidates = rng.standard_normal((n, DIM)).astype(np.float32)
+        stats = measure(lambda: mmr(query, candidates, k=10, lambda_=0.7))
+        report(f"mmr n={n} k=10", stats, BUDGET_MS if n == 200 else None)
+
+    # The /search call path: hits shaped like qdrant_search(with_vectors=True) output.
+    # Local-index hits carry float32 rows; Qdrant hits carry lists of Python floats,
+    # and turning those into an array costs far more than MMR itself.
+    for n in (40, 200):
+        candidates = rng.standard_normal((n, DIM)).astype(np.float32)
+        for backend, vectors in (
+            ("local", list(candidates)),
+            ("qdrant", candidates.tolist()),
+        ):
+            stats = measure(
+                lambda: mmr_rerank(
+                    query.tolist(),
+                    [{"problem_id": i, "vector": v} for i, v in enumerate(vectors)],
+                    k=10,
+                    lambda_=0.7,
+                )
+            )
+            report(f"mmr_rerank {backend} hits n={n} k=10", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from src.models import ProblemListItem, SearchResult
+from src.responses import FastJSONResponse, search_results
+
+from ._timing import measure, report
+
+N = 200
+BUDGET_MS = 1.0
+TAGS = ["Array", "Hash Table", "Two Pointers", "Dynamic Programming"]
+
+
+def _hits() -> list[dict]:
+    return [
+        {
+            "problem_id": i,
+            "title": f"Problem {i}",
+            "difficulty": "Medium",
+            "tags": TAGS[: i % 4 + 1],
+            "score": 0.9 - i / 1000,
+            "snippet": "Given an array of integers nums and an integer target, return indices "
+            * 7,
+            "chunk_type": "statement",
+            "offset": 0,
+            "length": 500,
+        }
+        for i in range(N)
+    ]
+
+
+def _problems() -> list[dict]:
+    return [
+        {
+            "problem_id": i,
+            "slug": f"problem-{i}",
+            "title": f"Problem {i}",
+            "difficulty": "Easy",
+            "tags": TAGS[: i % 4 + 1],
+            "url": f"https://leetcode.com/problems/problem-{i}/",
+        }
+        for i in range(N)
+    ]
+
+
+# What FastAPI does for a response_model: validate, dump to JSON-able data, json.dumps.
+def _response_model_path(adapter: TypeAdapter, content: list[Any]) -> bytes:
+    data = adapter.dump_python(adapter.validate_python(content), mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def main() -> None:
+    hits = _hits()
+    adapter = TypeAdapter(list[SearchResult])
+    stats = measure(lambda: _response_model_path(adapter, hits))
+    report(f"/search n={N} response_model", stats)
+    stats = measure(lambda: FastJSONResponse(search_results(hits)).body)
+    report(f"/search n={N} FastJSONResponse", stats, BUDGET_MS)
+
+    problems = _problems()
+    adapter = TypeAdapter(list[ProblemListItem])
+    # db.get_problems used to build a ProblemListItem per row before FastAPI re-validated it.
+    stats = measure(
+        lambda: _response_model_path(adapter, [ProblemListItem(**p) for p in problems])
+    )
+    report(f"/problems n={N} response_model", stats)
+    stats = measure(lambda: FastJSONResponse(problems).body)
+    report(f"/problems n={N} FastJSONResponse", stats, BUDGET_MS)
+
+
+if __name__ == "__main__":
+    main()
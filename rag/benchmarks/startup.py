@@ -0,0 +1,77 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _import_time() -> float:
+    out = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import time; t = time.perf_counter(); import src.api; print(time.perf_counter() - t)",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip()) * 1000
+
+
+def _time_to_ready(timeout: float) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.api:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                resp = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                if resp.status_code == 200 and resp.json().get("status") == "ok":
+                    return (time.perf_counter() - started) * 1000
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"/health not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    imports = sorted(_import_time() for _ in range(args.runs))
+    print(f"{'import src.api':<40} median {imports[len(imports) // 2]:8.1f} ms")
+    ready = sorted(_time_to_ready(args.timeout) for _ in range(args.runs))
+    print(
+        f"{'process start -> /health ok':<40} median {ready[len(ready) // 2]:8.1f} ms   max {ready[-1]:8.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
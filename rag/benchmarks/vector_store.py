@@ -0,0 +1,129 @@
+import os
+import tempfile
+import uuid
+
+import numpy as np
+
+from src.local_index import LocalIndex
+
+from ._timing import measure, report
+
+DIM = 1536
+N = int(os.environ.get("BENCH_VECTORS", "20000"))
+QUERIES = 50
+K = 10
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+TAGS = ["Array", "String", "Graph", "Dynamic Programming", "Tree"]
+
+
+def _dataset(rng: np.random.Generator) -> tuple[np.ndarray, list[dict]]:
+    vectors = rng.standard_normal((N, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    payloads = [
+        {
+            "problem_id": i // 4,
+            "difficulty": DIFFICULTIES[i % 3],
+            "tags": [TAGS[i % 5], TAGS[(i // 5) % 5]],
+            "chunk_type": "statement" if i % 2 else "editorial",
+        }
+        for i in range(N)
+    ]
+    return vectors, payloads
+
+
+def _bench_qdrant(
+    url: str, ids: list[str], vectors: np.ndarray, payloads: list[dict], queries, truth
+) -> None:
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import (
+        Distance,
+        FieldCondition,
+        Filter,
+        MatchValue,
+        VectorParams,
+    )
+
+    collection = f"bench-{uuid.uuid4().hex[:8]}"
+    client = QdrantClient(url=url)
+    client.create_collection(
+        collection, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE)
+    )
+    try:
+        client.upload_collection(
+            collection,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=512,
+            wait=True,
+        )
+        stats = measure(
+            lambda: client.query_points(collection, query=queries[0], limit=K),
+            repeat=100,
+        )
+        report("qdrant top-10", stats)
+        flt = Filter(
+            must=[FieldCondition(key="difficulty", match=MatchValue(value="Easy"))]
+        )
+        stats = measure(
+            lambda: client.query_points(
+                collection, query=queries[0], query_filter=flt, limit=K
+            ),
+            repeat=100,
+        )
+        report("qdrant top-10 difficulty=Easy", stats)
+
+        id_row = {point_id: row for row, point_id in enumerate(ids)}
+        found = 0
+        for q, expected in zip(queries, truth):
+            points = client.query_points(collection, query=q, limit=K).points
+            found += len({id_row[str(p.id)] for p in points} & expected)
+        print(f"qdrant recall@{K} vs exact: {found / (len(queries) * K):.3f}")
+    finally:
+        client.delete_collection(collection)
+        client.close()
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    vectors, payloads = _dataset(rng)
+    ids = [str(uuid.uuid4()) for _ in range(N)]
+    queries = rng.standard_normal((QUERIES, DIM)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LocalIndex(tmp, DIM)
+        index.append(ids, vectors, payloads)
+        print(
+            f"local index: {N} vectors, {os.path.getsize(os.path.join(tmp, 'vectors.f32')) / 2**20:.1f} MiB"
+        )
+
+        report(
+            "local top-10",
+            measure(lambda: index.search(queries[0], limit=K), repeat=100),
+        )
+        report(
+            "local top-10 difficulty=Easy",
+            measure(
+                lambda: index.search(queries[0], difficulty="Easy", limit=K), repeat=100
+            ),
+        )
+        report(
+            "local top-10 tags+chunk_type",
+            measure(
+                lambda: index.search(
+                    queries[0], tags=["Graph"], chunk_type="editorial", limit=K
+                ),
+                repeat=100,
+            ),
+        )
+        truth = [{row for row, _ in index.search(q, limit=K)} for q in queries]
+
+    url = os.environ.get("BENCH_QDRANT_URL")
+    if url:
+        _bench_qdrant(url, ids, vectors, payloads, queries, truth)
+    else:
+        print("BENCH_QDRANT_URL not set, skipping Qdrant comparison")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,197 @@
+import asyncio
+import os
+import secrets
+import tempfile
+import zipfile
 from contextlib import asynccontextmanager
+from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response
+from starlette.background import BackgroundTask
 
-from . import db
-from .embedder import embed_texts
-from .indexer import index_problem
-from .models import LoadProblemRequest, ProblemListItem, SearchRequest, SearchResult
+from . import background, db, embedder
+from .config import get_settings
+from .indexer import index_problem, index_problems
+from .models import (
+    LoadProblemRequest,
+    LoadProblemsRequest,
+    ParserProblem,
+    ProblemFacets,
+    ProblemListItem,
+    ProblemLookupItem,
+    ProblemPage,
+    SearchRequest,
+    SearchResult,
+    SimilarProblem,
+)
+from .neighbors import NEIGHBORS_K, update_neighbors
 from .parser_client import fetch_problem
+from .rerank import mmr_rerank
+from .resilience import CircuitOpenError, UpstreamUnavailable, breaker_states
+from .responses import FastJSONResponse, search_results
+from .snapshot import SnapshotError, export_snapshot, import_snapshot
+from .tracing import TimedRoute, TimingMiddleware, close_tracing, init_tracing
+
+# Parser requests in flight per /problems/load/batch call.
+LOAD_FETCH_CONCURRENCY = 4
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    init_tracing()
     await db.init_pg()
-    db.init_qdrant()
+    await db.init_vector_store()
+    await background.sample_health()
+    tasks = background.start()
     yield
-    db.close_qdrant()
+    await background.stop(tasks)
+    db.close_vector_store()
     await db.close_pg()
+    close_tracing()
 
 
 app = FastAPI(title="LeetCode RAG", lifespan=lifespan)
+app.router.route_class = TimedRoute
+# ty cannot match a middleware class against starlette's ParamSpec factory protocol.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)  # ty: ignore[invalid-argument-type]
+app.add_middleware(TimingMiddleware)  # ty: ignore[invalid-argument-type]
+
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable(request: Request, exc: UpstreamUnavailable):
+    headers = {}
+    if isinstance(exc, CircuitOpenError):
+        headers["Retry-After"] = str(max(1, round(exc.retry_after)))
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers=headers)
 
 
 @app.get("/health")
 async def health():
-    pg_ok = False
-    qdrant_ok = False
-    qdrant_points = 0
-    try:
-        if db.pg_pool is not None:
-            async with db.pg_pool.acquire() as conn:
-                await conn.fetchval("SELECT 1")
-            pg_ok = True
-    except Exception:
-        pass
-    try:
-        if db.qdrant is not None:
-            info = db.qdrant.get_collection(db.COLLECTION)
-            qdrant_ok = True
-            qdrant_points = info.points_count
-    except Exception:
-        pass
-    status = "ok" if (pg_ok and qdrant_ok) else "degraded"
     return {
-        "status": status,
-        "postgres": pg_ok,
-        "qdrant": qdrant_ok,
-        "qdrant_points": qdrant_points,
+        **background.health_state,
+        "breakers": breaker_states(),
+        "embeddings": embedder.usage,
     }
 
 
 @app.post("/problems/load")
 async def load_problem(body: LoadProblemRequest):
-    pp = await fetch_problem(body.slug)
-    problem_id = await index_problem(pp)
+    try:
+        pp = await fetch_problem(body.slug)
+        problem_id = await index_problem(pp)
+    except UpstreamUnavailable as e:
+        await db.enqueue_load(body.slug, str(e))
+        return JSONResponse(
+            {"status": "queued", "slug": body.slug, "detail": str(e)}, status_code=202
+        )
     return {"problem_id": problem_id, "title": pp.title}
 
 
+# Bulk ingest: one embedding pass over every problem's chunks. Slugs the parser cannot
+# serve right now are queued like single loads; other fetch errors are reported per slug.
+@app.post("/problems/load/batch")
+async def load_problems(body: LoadProblemsRequest):
+    slugs = list(dict.fromkeys(body.slugs))
+    fetch_slots = asyncio.Semaphore(LOAD_FETCH_CONCURRENCY)
+
+    async def fetch(slug: str):
+        async with fetch_slots:
+            return await fetch_problem(slug)
+
+    fetched = await asyncio.gather(*(fetch(s) for s in slugs), return_exceptions=True)
+    pps = [r for r in fetched if isinstance(r, ParserProblem)]
+    queued = {
+        s: str(r) for s, r in zip(slugs, fetched) if isinstance(r, UpstreamUnavailable)
+    }
+    failed = {
+        s: str(r)
+        for s, r in zip(slugs, fetched)
+        if isinstance(r, Exception) and not isinstance(r, UpstreamUnavailable)
+    }
+    loaded = []
+    if pps:
+        try:
+            problem_ids = await index_problems(pps)
+        except UpstreamUnavailable as e:
+            queued.update({pp.slug: str(e) for pp in pps})
+        else:
+            loaded = [
+                {"problem_id": problem_id, "title": pp.title}
+                for problem_id, pp in zip(problem_ids, pps)
+            ]
+    for slug, detail in queued.items():
+        await db.enqueue_load(slug, detail)
+    return JSONResponse(
+        {"loaded": loaded, "queued": sorted(queued), "failed": failed},
+        status_code=202 if queued else 200,
+    )
+
+
 @app.post("/search", response_model=list[SearchResult])
 async def search(req: SearchRequest):
-    vectors = embed_texts([req.query])
-    hits = db.qdrant_search(
-        vector=vectors[0],
-        difficulty=req.difficulty,
-        tags=req.tags,
-        chunk_type=req.chunk_type,
-        limit=req.limit,
-    )
-    return hits
+    rerank = req.mmr_lambda is not None
+    try:
+        vectors = await embedder.embed_texts([req.query])
+        hits = db.qdrant_search(
+            vector=vectors[0],
+            difficulty=req.difficulty,
+            tags=req.tags,
+            chunk_type=req.chunk_type,
+            limit=req.limit * req.fetch_multiplier if rerank else req.limit,
+            score_threshold=req.score_threshold,
+            with_vectors=rerank,
+        )
+    except UpstreamUnavailable:
+        hits = await db.lexical_search(
+            req.query,
+            difficulty=req.difficulty,
+            tags=req.tags,
+            chunk_type=req.chunk_type,
+            limit=req.limit,
+        )
+        return FastJSONResponse(hits, headers={"X-Search-Mode": "lexical"})
+    if req.mmr_lambda is not None:
+        hits = mmr_rerank(vectors[0], hits, req.limit, req.mmr_lambda)
+    hits = await db.hydrate_hits(hits, req.query)
+    return FastJSONResponse(search_results(hits))
 
 
-@app.get("/problems", response_model=list[ProblemListItem])
+@app.get("/problems", response_model=list[ProblemListItem] | ProblemPage)
 async def list_problems(
     difficulty: str | None = Query(None),
     tags: list[str] | None = Query(None),
     limit: int = Query(50, le=200),
+    facets: bool = Query(
+        False,
+        description="Wrap results as {items, facets}; facets count the difficulty "
+        "filter but not the tags filter",
+    ),
 ):
-    return await db.get_problems(
+    rows = await db.get_problems(
         difficulty=difficulty,
         tags=tags,
         limit=limit,
     )
+    if facets:
+        return FastJSONResponse(
+            {"items": rows, "facets": await db.get_facets(difficulty)}
+        )
+    return FastJSONResponse(rows)
+
+
+@app.get("/problems/facets", response_model=ProblemFacets)
+async def problem_facets(difficulty: str | None = Query(None)):
+    return FastJSONResponse(await db.get_facets(difficulty))
+
+
+@app.get("/problems/lookup", response_model=list[ProblemLookupItem])
+async def lookup_problems(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+):
+    return FastJSONResponse(db.problem_lookup.lookup(q, limit))
 
 
 @app.get("/problems/slugs", response_model=list[str])
@@ -87,17 +199,103 @@ async def loaded_slugs():
     return await db.get_loaded_slugs()
 
 
-@app.get("/problems/{problem_id}/statement")
-async def problem_statement(problem_id: int):
-    result = await db.get_problem_text(problem_id, "statement")
+@app.get("/problems/{problem_id}/similar", response_model=list[SimilarProblem])
+async def similar_problems(
+    problem_id: int, limit: int = Query(10, ge=1, le=NEIGHBORS_K)
+):
+    neighbors = await db.get_neighbors(problem_id, limit)
+    if not neighbors:
+        # Not precomputed yet: derive from the stored vectors once, then it is a plain read.
+        if await update_neighbors(problem_id, reverse=False) is None:
+            raise HTTPException(404, "Problem not indexed")
+        neighbors = await db.get_neighbors(problem_id, limit)
+    return FastJSONResponse(neighbors)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+async def _problem_text_response(
+    request: Request, problem_id: int, field: str
+) -> Response:
+    result = await db.get_problem_text(problem_id, field)
     if not result:
         raise HTTPException(404, "Problem not found")
-    return result
+    # Weak: GZipMiddleware may compress the body, and both encodings share this tag.
+    etag = f'W/"{result["content_hash"]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = {
+        "problem_id": result["problem_id"],
+        "title": result["title"],
+        "text": result["text"],
+    }
+    return FastJSONResponse(body, headers=headers)
+
+
+@app.get("/problems/{problem_id}/statement")
+async def problem_statement(request: Request, problem_id: int):
+    return await _problem_text_response(request, problem_id, "statement")
 
 
 @app.get("/problems/{problem_id}/editorial")
-async def problem_editorial(problem_id: int):
-    result = await db.get_problem_text(problem_id, "editorial")
-    if not result:
-        raise HTTPException(404, "Problem not found")
-    return result
+async def problem_editorial(request: Request, problem_id: int):
+    return await _problem_text_response(request, problem_id, "editorial")
+
+
+# ── Admin ──
+
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    admin_token = get_settings().ADMIN_TOKEN
+    if not admin_token or not x_admin_token:
+        raise HTTPException(403, "Admin token required")
+    if not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(403, "Invalid admin token")
+
+
+@app.get("/admin/snapshot", dependencies=[Depends(require_admin)])
+async def download_snapshot():
+    fd, path = tempfile.mkstemp(suffix=".zip")
+    os.close(fd)
+    try:
+        await export_snapshot(path)
+    except Exception:
+        os.unlink(path)
+        raise
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename="leetcode-rag-snapshot.zip",
+        # Already deflated; this keeps GZipMiddleware from recompressing it on the loop.
+        headers={"Content-Encoding": "identity"},
+        background=BackgroundTask(os.unlink, path),
+    )
+
+
+@app.put("/admin/snapshot", dependencies=[Depends(require_admin)])
+async def upload_snapshot(request: Request):
+    with tempfile.NamedTemporaryFile(suffix=".zip") as f:
+        async for chunk in request.stream():
+            f.write(chunk)
+        f.flush()
+        try:
+            return await import_snapshot(f.name)
+        except (SnapshotError, zipfile.BadZipFile) as e:
+            raise HTTPException(400, str(e)) from e
+
+
+@app.get("/admin/profiles/{name}", dependencies=[Depends(require_admin)])
+async def download_profile(name: str):
+    path = Path(get_settings().PROFILE_DIR) / name
+    if Path(name).name != name or not path.is_file():
+        raise HTTPException(404, "Profile not found")
+    return FileResponse(path)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+
+from . import db
+from .config import get_settings
+from .indexer import index_problem
+from .parser_client import fetch_problem
+from .resilience import UpstreamUnavailable, breaker
+
+logger = logging.getLogger(__name__)
+
+LOAD_DEPENDENCIES = ("parser", "openai", "qdrant")
+RETRY_BATCH = 10
+# Seconds a claimed load stays hidden from other workers; covers parser, embedding and upsert.
+LOAD_CLAIM_LEASE = 600
+
+# Last sampled dependency state; /health answers from here instead of probing per request.
+health_state: dict = {"status": "starting"}
+
+
+async def sample_health():
+    pg_ok = False
+    qdrant_ok = False
+    qdrant_points = 0
+    pending_loads = 0
+    try:
+        if db.pg_pool is not None:
+            pending_loads = await db.count_pending_loads()
+            pg_ok = True
+    except Exception:
+        pass
+    try:
+        if db.local_index is not None:
+            # The local index is in-process and its count is cheap; no thread needed.
+            qdrant_points = db.count_points()
+        else:
+            qdrant_points = await asyncio.to_thread(db.count_points)
+        qdrant_ok = True
+    except Exception:
+        pass
+    health_state.update(
+        status="ok" if (pg_ok and qdrant_ok) else "degraded",
+        postgres=pg_ok,
+        qdrant=qdrant_ok,
+        qdrant_points=qdrant_points,
+        vector_backend=get_settings().VECTOR_BACKEND,
+        pending_loads=pending_loads,
+        sampled_at=time.time(),
+    )
+
+
+async def retry_pending_loads() -> int:
+    loaded = 0
+    for _ in range(RETRY_BATCH):
+        if not all(breaker(name).allow() for name in LOAD_DEPENDENCIES):
+            break
+        slug = await db.claim_pending_load(LOAD_CLAIM_LEASE)
+        if slug is None:
+            break
+        try:
+            await index_problem(await fetch_problem(slug))
+        except UpstreamUnavailable as e:
+            await db.release_pending_load(slug, str(e))
+            break
+        except Exception:
+            logger.exception("Dropping queued load for %s", slug)
+        else:
+            loaded += 1
+        await db.delete_pending_load(slug)
+    return loaded
+
+
+async def _every(interval: float, fn):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await fn()
+        except Exception:
+            logger.exception("Background task %s failed", fn.__name__)
+
+
+def start() -> list[asyncio.Task]:
+    settings = get_settings()
+    return [
+        asyncio.create_task(_every(settings.HEALTH_SAMPLE_INTERVAL, sample_health)),
+        asyncio.create_task(_every(settings.LOAD_RETRY_INTERVAL, retry_pending_loads)),
+    ]
+
+
+async def stop(tasks: list[asyncio.Task]):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -4,14 +4,14 @@ MAX_CHUNK_LEN = 2000
 OVERLAP = 200
 
 
-def _split_text(text: str) -> list[str]:
+def _split_text(text: str) -> list[tuple[int, str]]:
     if len(text) <= MAX_CHUNK_LEN:
-        return [text]
+        return [(0, text)]
     parts = []
     start = 0
     while start < len(text):
         end = start + MAX_CHUNK_LEN
-        parts.append(text[start:end])
+        parts.append((start, text[start:end]))
         start = end - OVERLAP
     return parts
 
@@ -20,7 +20,7 @@ def chunk_problem(problem: Problem) -> list[Chunk]:
     chunks: list[Chunk] = []
 
     if problem.statement:
-        for part in _split_text(problem.statement):
+        for offset, part in _split_text(problem.statement):
             chunks.append(
                 Chunk(
                     problem_id=problem.problem_id,
@@ -29,11 +29,12 @@ def chunk_problem(problem: Problem) -> list[Chunk]:
                     tags=problem.tags,
                     chunk_type="statement",
                     text=part,
+                    offset=offset,
                 )
             )
 
     if problem.editorial:
-        for part in _split_text(problem.editorial):
+        for offset, part in _split_text(problem.editorial):
             chunks.append(
                 Chunk(
                     problem_id=problem.problem_id,
@@ -42,6 +43,7 @@ def chunk_problem(problem: Problem) -> list[Chunk]:
                     tags=problem.tags,
                     chunk_type="editorial",
                     text=part,
+                    offset=offset,
                 )
             )
 
@@ -1,69 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
 import uuid
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
 
 import asyncpg
-from qdrant_client import QdrantClient
-from qdrant_client.models import (
-    Distance,
-    FieldCondition,
-    Filter,
-    MatchAny,
-    MatchValue,
-    OptimizersConfigDiff,
-    PayloadSchemaType,
-    PointStruct,
-    VectorParams,
-)
-
-from .config import settings
-from .models import Chunk, Problem, ProblemListItem
+import numpy as np
+
+from . import migrations
+from .cache import LRUCache
+from .config import get_settings
+from .local_index import LocalIndex
+from .lookup import LookupIndex
+from .models import Chunk, Problem
+from .resilience import breaker
+from .snippets import query_window
+from .tracing import span
+
+# qdrant_client is heavy to import; load it only when the Qdrant backend is used.
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
+logger = logging.getLogger(__name__)
 
 COLLECTION = "leetcode"
 VECTOR_DIM = 1536
+TEXT_FIELDS = ("statement", "editorial")
+
+PROBLEM_CHANGED_CHANNEL = "problem_changed"
+# Namespaces for per-problem advisory locks (two-key form, separate from the migration lock).
+FACET_LOCK_NS = 4_812
+NEIGHBORS_LOCK_NS = 4_813
+# Upper bound on the backoff between listener reconnect attempts, in seconds.
+LISTENER_RETRY_MAX = 30.0
 
+# Per-process state: filled by init_* inside each worker's lifespan, never at import,
+# so forked uvicorn/gunicorn workers never share sockets or file handles.
 pg_pool: asyncpg.Pool | None = None
 qdrant: QdrantClient | None = None
+local_index: LocalIndex | None = None
+_pg_listener: asyncpg.Connection | None = None
+_pg_reconnect: asyncio.Task | None = None
+
+_text_cache: LRUCache[tuple[int, str], dict] = LRUCache(0)
+# Bumped on every invalidation (key None: all problems); a fill that raced one is not cached.
+_text_generation: Counter[int | None] = Counter()
+problem_lookup = LookupIndex()
+_lookup_refreshes: set[asyncio.Task] = set()
+# Problems notified while a full lookup load is in flight (None: everything); replayed after it.
+_lookup_missed: set[int | None] | None = None
 
 
 async def init_pg() -> asyncpg.Pool:
     global pg_pool
-    pg_pool = await asyncpg.create_pool(settings.POSTGRES_URL)
+    settings = get_settings()
+    _text_cache.maxsize = settings.TEXT_CACHE_SIZE
+    pg_pool = await asyncpg.create_pool(
+        settings.POSTGRES_URL,
+        min_size=settings.PG_POOL_MIN_SIZE,
+        max_size=settings.PG_POOL_MAX_SIZE,
+        statement_cache_size=settings.PG_STATEMENT_CACHE_SIZE,
+        command_timeout=settings.PG_COMMAND_TIMEOUT,
+    )
+    async with pg_pool.acquire() as conn:
+        await migrations.migrate_pg(conn)
+    # Subscribe before the lookup load, so no change falls between the two.
+    await _listen_problem_changes()
     async with pg_pool.acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS problems (
-                problem_id   INTEGER PRIMARY KEY,
-                slug         TEXT NOT NULL UNIQUE,
-                title        TEXT NOT NULL,
-                difficulty   TEXT NOT NULL,
-                tags         TEXT[] DEFAULT '{}',
-                statement    TEXT,
-                editorial    TEXT,
-                url          TEXT,
-                created_at   TIMESTAMP DEFAULT NOW()
-            );
-            CREATE INDEX IF NOT EXISTS idx_difficulty ON problems(difficulty);
-            CREATE INDEX IF NOT EXISTS idx_tags ON problems USING GIN(tags);
-            CREATE INDEX IF NOT EXISTS idx_slug ON problems(slug);
-        """)
+        await load_problem_lookup(conn)
     return pg_pool
 
 
-def init_qdrant() -> QdrantClient:
+def _on_problem_changed(conn, pid, channel, payload: str):
+    problem_id = None if payload == "*" else int(payload)
+    invalidate_problem_text(problem_id)
+    if _lookup_missed is not None:
+        _lookup_missed.add(problem_id)
+    # The lookup index needs the new row, so refresh it off the listener callback.
+    task = asyncio.create_task(_refresh_problem_lookup(problem_id))
+    _lookup_refreshes.add(task)
+    task.add_done_callback(_lookup_refreshes.discard)
+
+
+async def _refresh_problem_lookup(problem_id: int | None):
+    if pg_pool is None:
+        return
+    try:
+        async with pg_pool.acquire() as conn:
+            await load_problem_lookup(conn, problem_id)
+    except (asyncpg.PostgresError, OSError) as e:
+        logger.warning("Lookup refresh for problem %s failed: %s", problem_id or "*", e)
+
+
+async def _listen_problem_changes():
+    # Other workers write problems too; NOTIFY keeps every process's caches coherent.
+    global _pg_listener
+    conn = await asyncpg.connect(get_settings().POSTGRES_URL)
+    await conn.add_listener(PROBLEM_CHANGED_CHANNEL, _on_problem_changed)
+    conn.add_termination_listener(_on_listener_lost)
+    _pg_listener = conn
+
+
+def _on_listener_lost(conn):
+    global _pg_reconnect
+    # close_pg() clears _pg_listener first, so only unexpected losses get here.
+    if conn is not _pg_listener or pg_pool is None:
+        return
+    logger.warning("Lost the %s listener; reconnecting", PROBLEM_CHANGED_CHANNEL)
+    _pg_reconnect = asyncio.create_task(_reconnect_listener())
+
+
+async def _reconnect_listener():
+    delay = 1.0
+    while pg_pool is not None:
+        try:
+            await _listen_problem_changes()
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+            logger.warning(
+                "Listener reconnect failed (%s); retrying in %.0f s", e, delay
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTENER_RETRY_MAX)
+            continue
+        # Changes committed while disconnected were never delivered.
+        _on_problem_changed(None, 0, PROBLEM_CHANGED_CHANNEL, "*")
+        logger.info("Reconnected the %s listener", PROBLEM_CHANGED_CHANNEL)
+        return
+
+
+async def init_qdrant() -> QdrantClient:
+    from qdrant_client import QdrantClient
+
     global qdrant
-    qdrant = QdrantClient(url=settings.QDRANT_URL)
-    if not qdrant.collection_exists(COLLECTION):
-        qdrant.create_collection(
-            collection_name=COLLECTION,
-            vectors_config=VectorParams(size=VECTOR_DIM, distance=Distance.COSINE),
-            optimizers_config=OptimizersConfigDiff(memmap_threshold=1000),
-        )
-    qdrant.create_payload_index(COLLECTION, "difficulty", PayloadSchemaType.KEYWORD)
-    qdrant.create_payload_index(COLLECTION, "tags", PayloadSchemaType.KEYWORD)
-    qdrant.create_payload_index(COLLECTION, "chunk_type", PayloadSchemaType.KEYWORD)
+    settings = get_settings()
+    qdrant = QdrantClient(
+        url=settings.QDRANT_URL,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        timeout=settings.QDRANT_TIMEOUT,
+    )
+    assert pg_pool is not None
+    async with pg_pool.acquire() as conn:
+        await migrations.migrate_qdrant(conn, qdrant, COLLECTION, VECTOR_DIM)
     return qdrant
 
 
+def init_local_index() -> LocalIndex:
+    global local_index
+    local_index = LocalIndex(get_settings().LOCAL_INDEX_PATH, VECTOR_DIM)
+    return local_index
+
+
+async def init_vector_store():
+    if get_settings().VECTOR_BACKEND == "local":
+        init_local_index()
+    else:
+        await init_qdrant()
+
+
 async def close_pg():
-    global pg_pool
+    global pg_pool, _pg_listener, _pg_reconnect
+    if _pg_reconnect:
+        _pg_reconnect.cancel()
+        _pg_reconnect = None
+    if _pg_listener:
+        listener, _pg_listener = _pg_listener, None
+        await listener.close()
     if pg_pool:
         await pg_pool.close()
         pg_pool = None
@@ -76,42 +182,171 @@ def close_qdrant():
         qdrant = None
 
 
+def close_vector_store():
+    global local_index
+    close_qdrant()
+    local_index = None
+
+
 # ── PostgreSQL operations ──
 
 
+def content_hash(title: str, text: str | None) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(title.encode())
+    h.update(b"\0")
+    h.update((text or "").encode())
+    return h.hexdigest()
+
+
+def invalidate_problem_text(problem_id: int | None = None):
+    _text_generation[problem_id] += 1
+    if problem_id is None:
+        _text_cache.clear()
+        return
+    for field in TEXT_FIELDS:
+        _text_cache.discard((problem_id, field))
+
+
+# Full reload for problem_id=None; otherwise re-reads one row (dropping it if gone).
+async def load_problem_lookup(conn: asyncpg.Connection, problem_id: int | None = None):
+    global _lookup_missed
+    if problem_id is None:
+        # A per-problem refresh that lands during the fetch would be overwritten by
+        # load(), so changes notified meanwhile are applied again on top.
+        _lookup_missed = set()
+        try:
+            rows = await conn.fetch(
+                "SELECT problem_id, slug, title, difficulty FROM problems"
+            )
+        finally:
+            missed, _lookup_missed = _lookup_missed, None
+        problem_lookup.load(
+            (r["problem_id"], r["slug"], r["title"], r["difficulty"]) for r in rows
+        )
+        if None in missed:
+            await load_problem_lookup(conn)
+            return
+        for missed_id in sorted(missed):
+            await load_problem_lookup(conn, missed_id)
+        return
+    r = await conn.fetchrow(
+        "SELECT problem_id, slug, title, difficulty FROM problems WHERE problem_id = $1",
+        problem_id,
+    )
+    if r is None:
+        problem_lookup.remove(problem_id)
+    else:
+        problem_lookup.add(r["problem_id"], r["slug"], r["title"], r["difficulty"])
+
+
+# Facet rows: ("", "") is the total, (d, "") per difficulty, ("", t) per tag, (d, t) per pair.
+def _facet_keys(difficulty: str, tags: Iterable[str]) -> set[tuple[str, str]]:
+    keys = {("", ""), (difficulty, "")}
+    for tag in tags:
+        keys.add(("", tag))
+        keys.add((difficulty, tag))
+    return keys
+
+
+async def _apply_facet_delta(
+    conn: asyncpg.Connection, old: asyncpg.Record | None, new: Problem
+):
+    delta = Counter(_facet_keys(new.difficulty, new.tags))
+    if old is not None:
+        delta.subtract(_facet_keys(old["difficulty"], old["tags"] or []))
+    # Sorted, so concurrent upserts lock facet rows in the same order.
+    changes = sorted((key, n) for key, n in delta.items() if n)
+    if not changes:
+        return
+    await conn.execute(
+        """
+        INSERT INTO facet_counts (difficulty, tag, count)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::int[])
+        ON CONFLICT (difficulty, tag) DO UPDATE SET count = facet_counts.count + EXCLUDED.count
+        """,
+        [d for (d, _), _ in changes],
+        [t for (_, t), _ in changes],
+        [n for _, n in changes],
+    )
+
+
 async def upsert_problem(p: Problem):
     assert pg_pool is not None
-    async with pg_pool.acquire() as conn:
+    with span("postgres"):
+        async with pg_pool.acquire() as conn, conn.transaction():
+            # Concurrent upserts of one problem must see each other's row to get facet deltas right.
+            await conn.execute(
+                "SELECT pg_advisory_xact_lock($1, $2)", FACET_LOCK_NS, p.problem_id
+            )
+            old = await conn.fetchrow(
+                "SELECT difficulty, tags FROM problems WHERE problem_id = $1",
+                p.problem_id,
+            )
+            await conn.execute(
+                """
+                INSERT INTO problems (problem_id, slug, title, difficulty, tags,
+                                      statement, editorial, url,
+                                      statement_hash, editorial_hash)
+                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10)
+                ON CONFLICT (problem_id) DO UPDATE SET
+                    slug           = EXCLUDED.slug,
+                    title          = EXCLUDED.title,
+                    difficulty     = EXCLUDED.difficulty,
+                    tags           = EXCLUDED.tags,
+                    statement      = EXCLUDED.statement,
+                    editorial      = EXCLUDED.editorial,
+                    url            = EXCLUDED.url,
+                    statement_hash = EXCLUDED.statement_hash,
+                    editorial_hash = EXCLUDED.editorial_hash
+                """,
+                p.problem_id,
+                p.slug,
+                p.title,
+                p.difficulty,
+                p.tags,
+                p.statement,
+                p.editorial,
+                p.url,
+                content_hash(p.title, p.statement),
+                content_hash(p.title, p.editorial),
+            )
+            await _apply_facet_delta(conn, old, p)
+            await notify_problem_changed(conn, p.problem_id)
+    invalidate_problem_text(p.problem_id)
+    problem_lookup.add(p.problem_id, p.slug, p.title, p.difficulty)
+
+
+async def rebuild_facets(conn: asyncpg.Connection):
+    # A savepoint when called inside a transaction; the lock is held until the outer commit.
+    async with conn.transaction():
+        await conn.execute("LOCK TABLE facet_counts IN SHARE ROW EXCLUSIVE MODE")
+        await conn.execute("DELETE FROM facet_counts")
         await conn.execute(
             """
-            INSERT INTO problems (problem_id, slug, title, difficulty, tags,
-                                  statement, editorial, url)
-            VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
-            ON CONFLICT (problem_id) DO UPDATE SET
-                slug       = EXCLUDED.slug,
-                title      = EXCLUDED.title,
-                difficulty = EXCLUDED.difficulty,
-                tags       = EXCLUDED.tags,
-                statement  = EXCLUDED.statement,
-                editorial  = EXCLUDED.editorial,
-                url        = EXCLUDED.url
-            """,
-            p.problem_id,
-            p.slug,
-            p.title,
-            p.difficulty,
-            p.tags,
-            p.statement,
-            p.editorial,
-            p.url,
+            WITH p AS (SELECT problem_id, difficulty, tags FROM problems),
+                 t AS (SELECT DISTINCT problem_id, difficulty, tag FROM p, unnest(p.tags) AS tag)
+            INSERT INTO facet_counts (difficulty, tag, count)
+            SELECT '', '', count(*) FROM p
+            UNION ALL SELECT difficulty, '', count(*) FROM p GROUP BY difficulty
+            UNION ALL SELECT '', tag, count(*) FROM t GROUP BY tag
+            UNION ALL SELECT difficulty, tag, count(*) FROM t GROUP BY difficulty, tag
+            """
         )
 
 
+async def notify_problem_changed(
+    conn: asyncpg.Connection, problem_id: int | None = None
+):
+    payload = "*" if problem_id is None else str(problem_id)
+    await conn.execute("SELECT pg_notify($1, $2)", PROBLEM_CHANGED_CHANNEL, payload)
+
+
 async def get_problems(
     difficulty: str | None = None,
     tags: list[str] | None = None,
     limit: int = 50,
-) -> list[ProblemListItem]:
+) -> list[dict]:
     conditions = []
     args: list = []
     idx = 1
@@ -130,64 +365,451 @@ async def get_problems(
     args.append(limit)
 
     assert pg_pool is not None
-    async with pg_pool.acquire() as conn:
-        rows = await conn.fetch(query, *args)
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
 
     return [
-        ProblemListItem(
-            problem_id=r["problem_id"],
-            slug=r["slug"],
-            title=r["title"],
-            difficulty=r["difficulty"],
-            tags=list(r["tags"]) if r["tags"] else [],
-            url=r["url"],
-        )
+        {
+            "problem_id": r["problem_id"],
+            "slug": r["slug"],
+            "title": r["title"],
+            "difficulty": r["difficulty"],
+            "tags": list(r["tags"]) if r["tags"] else [],
+            "url": r["url"],
+        }
         for r in rows
     ]
 
 
 async def get_loaded_slugs() -> list[str]:
     assert pg_pool is not None
-    async with pg_pool.acquire() as conn:
-        rows = await conn.fetch("SELECT slug FROM problems ORDER BY problem_id")
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            rows = await conn.fetch("SELECT slug FROM problems ORDER BY problem_id")
     return [r["slug"] for r in rows]
 
 
+async def get_problem_ids() -> list[int]:
+    assert pg_pool is not None
+    async with pg_pool.acquire() as conn:
+        rows = await conn.fetch("SELECT problem_id FROM problems ORDER BY problem_id")
+    return [r["problem_id"] for r in rows]
+
+
+# facet_counts holds one row per difficulty, tag and (difficulty, tag) pair, so this
+# read costs the same whether 100 or 100 000 problems are loaded.
+# With a difficulty, counts cover only that difficulty: its ("d", "") row is the total
+# and its ("d", tag) pairs are the tag counts. Tag filters are not applied; the pair
+# table cannot count problems matching any of several tags without double counting.
+async def get_facets(difficulty: str | None = None) -> dict:
+    query = "SELECT difficulty, tag, count FROM facet_counts WHERE count > 0"
+    args: list = []
+    if difficulty is not None:
+        query += " AND difficulty = $1"
+        args.append(difficulty)
+    assert pg_pool is not None
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            rows = await conn.fetch(query + " ORDER BY count DESC, tag", *args)
+    facets: dict = {"total": 0, "difficulty": {}, "tags": {}, "difficulty_tags": {}}
+    for r in rows:
+        d, tag, count = r["difficulty"], r["tag"], r["count"]
+        if not tag:
+            if not d or difficulty is not None:
+                facets["total"] = count
+            if d:
+                facets["difficulty"][d] = count
+        else:
+            if not d or difficulty is not None:
+                facets["tags"][tag] = count
+            if d:
+                facets["difficulty_tags"].setdefault(d, {})[tag] = count
+    return facets
+
+
 async def get_problem_text(problem_id: int, field: str) -> dict | None:
-    if field not in ("statement", "editorial"):
+    if field not in TEXT_FIELDS:
         return None
+    cached = _text_cache.get((problem_id, field))
+    if cached is not None:
+        return cached
+    generation = (_text_generation[None], _text_generation[problem_id])
     assert pg_pool is not None
-    async with pg_pool.acquire() as conn:
-        row = await conn.fetchrow(
-            f"SELECT problem_id, title, {field} AS text FROM problems WHERE problem_id = $1",
-            problem_id,
-        )
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            row = await conn.fetchrow(
+                f"SELECT problem_id, title, {field} AS text, {field}_hash AS hash "
+                "FROM problems WHERE problem_id = $1",
+                problem_id,
+            )
     if not row:
         return None
-    return {"problem_id": row["problem_id"], "title": row["title"], "text": row["text"]}
+    result = {
+        "problem_id": row["problem_id"],
+        "title": row["title"],
+        "text": row["text"],
+        "content_hash": row["hash"] or content_hash(row["title"], row["text"]),
+    }
+    if generation == (_text_generation[None], _text_generation[problem_id]):
+        _text_cache.put((problem_id, field), result)
+    return result
+
+
+async def get_neighbors(problem_id: int, limit: int = 10) -> list[dict]:
+    assert pg_pool is not None
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT p.problem_id, p.slug, p.title, p.difficulty, p.tags, n.score
+                FROM problem_neighbors n
+                JOIN problems p ON p.problem_id = n.neighbor_id
+                WHERE n.problem_id = $1
+                ORDER BY n.score DESC
+                LIMIT $2
+                """,
+                problem_id,
+                limit,
+            )
+    return [
+        {
+            "problem_id": r["problem_id"],
+            "slug": r["slug"],
+            "title": r["title"],
+            "difficulty": r["difficulty"],
+            "tags": list(r["tags"]) if r["tags"] else [],
+            "score": r["score"],
+        }
+        for r in rows
+    ]
+
+
+# `reverse` holds (neighbor_id, score) edges into other problems' lists, each scored
+# against that neighbor's own centroid so it ranks fairly among the neighbor's rows.
+async def store_neighbors(
+    problem_id: int,
+    neighbors: list[tuple[int, float]],
+    keep: int,
+    reverse: list[tuple[int, float]] | None = None,
+):
+    ids = [n for n, _ in neighbors]
+    scores = [s for _, s in neighbors]
+    reverse = sorted(reverse or [])
+    # Every list this call rewrites, locked in id order so concurrent loads of
+    # problems that share neighbors cannot deadlock.
+    owners = sorted({problem_id, *(n for n, _ in reverse)})
+    assert pg_pool is not None
+    with span("postgres"):
+        async with pg_pool.acquire() as conn, conn.transaction():
+            await conn.execute(
+                "SELECT pg_advisory_xact_lock($1, id) FROM unnest($2::int[]) AS id",
+                NEIGHBORS_LOCK_NS,
+                owners,
+            )
+            await conn.execute(
+                "DELETE FROM problem_neighbors WHERE problem_id = $1", problem_id
+            )
+            await conn.execute(
+                """
+                INSERT INTO problem_neighbors (problem_id, neighbor_id, score)
+                SELECT $1, n, s FROM unnest($2::int[], $3::real[]) AS u(n, s)
+                """,
+                problem_id,
+                ids,
+                scores,
+            )
+            if not reverse:
+                return
+            # This problem may now rank among its neighbors' own top `keep`.
+            await conn.execute(
+                """
+                INSERT INTO problem_neighbors (problem_id, neighbor_id, score)
+                SELECT n, $1, s FROM unnest($2::int[], $3::real[]) AS u(n, s)
+                ON CONFLICT (problem_id, neighbor_id) DO UPDATE SET score = EXCLUDED.score
+                """,
+                problem_id,
+                [n for n, _ in reverse],
+                [s for _, s in reverse],
+            )
+            await conn.execute(
+                """
+                DELETE FROM problem_neighbors pn
+                USING (
+                    SELECT problem_id, neighbor_id,
+                           row_number() OVER (PARTITION BY problem_id ORDER BY score DESC) AS rank
+                    FROM problem_neighbors
+                    WHERE problem_id = ANY($1::int[])
+                ) r
+                WHERE pn.problem_id = r.problem_id AND pn.neighbor_id = r.neighbor_id AND r.rank > $2
+                """,
+                [n for n, _ in reverse],
+                keep,
+            )
+
+
+async def lexical_search(
+    query: str,
+    difficulty: str | None = None,
+    tags: list[str] | None = None,
+    chunk_type: str | None = None,
+    limit: int = 10,
+) -> list[dict]:
+    conditions = ["search_tsv @@ q"]
+    args: list = [query]
+    idx = 2
+
+    if difficulty is not None:
+        conditions.append(f"difficulty = ${idx}")
+        args.append(difficulty)
+        idx += 1
+    if tags:
+        conditions.append(f"tags && ${idx}")
+        args.append(tags)
+        idx += 1
+
+    field = "editorial" if chunk_type == "editorial" else "statement"
+    if chunk_type == "editorial":
+        conditions.append("editorial IS NOT NULL")
+    query_sql = f"""
+        SELECT problem_id, title, difficulty, tags,
+               ts_rank(search_tsv, q) AS score,
+               ts_headline('english', coalesce({field}, ''), q,
+                           'MaxFragments=2, MaxWords=40, MinWords=15') AS snippet
+        FROM problems, plainto_tsquery('english', $1) q
+        WHERE {" AND ".join(conditions)}
+        ORDER BY score DESC
+        LIMIT ${idx}
+    """
+    args.append(limit)
+
+    assert pg_pool is not None
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            rows = await conn.fetch(query_sql, *args)
+    return [
+        {
+            "problem_id": r["problem_id"],
+            "title": r["title"],
+            "difficulty": r["difficulty"],
+            "tags": list(r["tags"]) if r["tags"] else [],
+            "score": float(r["score"]),
+            "snippet": r["snippet"],
+        }
+        for r in rows
+    ]
+
+
+async def enqueue_load(slug: str, error: str):
+    assert pg_pool is not None
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO pending_loads (slug, last_error) VALUES ($1, $2)
+                ON CONFLICT (slug) DO UPDATE SET last_error = EXCLUDED.last_error
+                """,
+                slug,
+                error,
+            )
+
+
+# Claims the oldest unclaimed load for `lease` seconds and commits at once, so no
+# connection is held while it runs. A claim left by a dead worker simply expires.
+async def claim_pending_load(lease: float) -> str | None:
+    assert pg_pool is not None
+    async with pg_pool.acquire() as conn:
+        return await conn.fetchval(
+            """
+            UPDATE pending_loads SET claimed_until = NOW() + make_interval(secs => $1)
+            WHERE slug = (
+                SELECT slug FROM pending_loads
+                WHERE claimed_until IS NULL OR claimed_until < NOW()
+                ORDER BY enqueued_at LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING slug
+            """,
+            lease,
+        )
+
+
+async def release_pending_load(slug: str, error: str):
+    assert pg_pool is not None
+    async with pg_pool.acquire() as conn:
+        await conn.execute(
+            """
+            UPDATE pending_loads
+            SET attempts = attempts + 1, last_error = $2, claimed_until = NULL
+            WHERE slug = $1
+            """,
+            slug,
+            error,
+        )
+
+
+async def delete_pending_load(slug: str):
+    assert pg_pool is not None
+    async with pg_pool.acquire() as conn:
+        await conn.execute("DELETE FROM pending_loads WHERE slug = $1", slug)
+
+
+async def count_pending_loads() -> int:
+    assert pg_pool is not None
+    async with pg_pool.acquire() as conn:
+        return await conn.fetchval("SELECT count(*) FROM pending_loads")
 
 
 # ── Qdrant operations ──
 
 
+def _qdrant_outage(exc: BaseException) -> bool:
+    import grpc
+    from qdrant_client.http.exceptions import (
+        ResponseHandlingException,
+        UnexpectedResponse,
+    )
+
+    if isinstance(exc, UnexpectedResponse):
+        return (exc.status_code or 500) >= 500
+    # Raised RpcErrors are also grpc.Call, which is what carries code().
+    if isinstance(exc, grpc.Call):
+        return exc.code() in (
+            grpc.StatusCode.UNAVAILABLE,
+            grpc.StatusCode.DEADLINE_EXCEEDED,
+        )
+    return isinstance(exc, (ResponseHandlingException, TimeoutError, ConnectionError))
+
+
+def _chunk_payload(c: Chunk) -> dict:
+    payload = {
+        "problem_id": c.problem_id,
+        "difficulty": c.difficulty,
+        "tags": c.tags,
+        "chunk_type": c.chunk_type,
+        "offset": c.offset,
+        "length": len(c.text),
+    }
+    if not get_settings().QDRANT_SLIM_PAYLOAD:
+        payload["title"] = c.title
+        payload["text"] = c.text[:500]
+    return payload
+
+
 def qdrant_upsert_chunks(chunks: list[Chunk], vectors: list[list[float]]):
+    if not chunks:
+        return
+    ids = [str(uuid.uuid4()) for _ in chunks]
+    payloads = [_chunk_payload(c) for c in chunks]
+    # Slim points hold offsets into the current text, so a reload must retire the
+    # problem's older points or they would hydrate the wrong passage.
+    replace = chunks[0].problem_id if get_settings().QDRANT_SLIM_PAYLOAD else None
+    if local_index is not None:
+        with span("qdrant"):
+            local_index.append(
+                ids, np.asarray(vectors, dtype=np.float32), payloads, replace=replace
+            )
+        return
+
+    from qdrant_client.models import Filter, FilterSelector, HasIdCondition, PointStruct
+
     points = [
-        PointStruct(
-            id=str(uuid.uuid4()),
-            vector=vec,
-            payload={
-                "problem_id": c.problem_id,
-                "title": c.title,
-                "difficulty": c.difficulty,
-                "tags": c.tags,
-                "chunk_type": c.chunk_type,
-                "text": c.text[:500],
-            },
-        )
-        for c, vec in zip(chunks, vectors)
+        PointStruct(id=point_id, vector=vec, payload=payload)
+        for point_id, vec, payload in zip(ids, vectors, payloads)
     ]
     assert qdrant is not None
-    qdrant.upsert(collection_name=COLLECTION, points=points)
+    with span("qdrant"), breaker("qdrant", _qdrant_outage):
+        qdrant.upsert(collection_name=COLLECTION, points=points)
+        if replace is not None:
+            stale = Filter(
+                must=[_problem_filter(replace)],
+                must_not=[HasIdCondition(has_id=list(ids))],
+            )
+            qdrant.delete(COLLECTION, points_selector=FilterSelector(filter=stale))
+
+
+def iter_points(
+    batch_size: int = 1024,
+) -> Iterator[tuple[list[str], np.ndarray, list[dict]]]:
+    if local_index is not None:
+        local_index.refresh()
+        live = local_index.live_rows()
+        for start in range(0, len(live), batch_size):
+            rows = live[start : start + batch_size]
+            yield (
+                [local_index.point_id(r) for r in rows],
+                np.stack([local_index.vector(r) for r in rows]),
+                [local_index.payload(r) for r in rows],
+            )
+        return
+
+    assert qdrant is not None
+    offset = None
+    while True:
+        records, offset = qdrant.scroll(
+            COLLECTION,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            yield (
+                [str(r.id) for r in records],
+                np.asarray([r.vector for r in records], dtype=np.float32),
+                [r.payload or {} for r in records],
+            )
+        if offset is None:
+            return
+
+
+def bulk_upsert_points(
+    batches: Iterable[tuple[list[str], np.ndarray, list[dict]]],
+    parallel: int = 4,
+):
+    if local_index is not None:
+        # Qdrant upserts by id; the append-only index must skip ids it already holds,
+        # or importing the same snapshot twice would duplicate every vector.
+        for ids, vectors, payloads in batches:
+            local_index.refresh()
+            new = [i for i, point_id in enumerate(ids) if point_id not in local_index]
+            if new:
+                local_index.append(
+                    [ids[i] for i in new], vectors[new], [payloads[i] for i in new]
+                )
+        return
+
+    from qdrant_client.models import PointStruct
+
+    assert qdrant is not None
+    qdrant.upload_points(
+        COLLECTION,
+        points=(
+            PointStruct(id=point_id, vector=vec.tolist(), payload=payload)
+            for ids, vectors, payloads in batches
+            for point_id, vec, payload in zip(ids, vectors, payloads)
+        ),
+        batch_size=512,
+        parallel=parallel,
+        wait=True,
+    )
+
+
+def _hit(payload: dict, score: float, vector=None) -> dict:
+    hit = {
+        "problem_id": payload["problem_id"],
+        "title": payload.get("title"),
+        "difficulty": payload.get("difficulty", ""),
+        "tags": payload.get("tags", []),
+        "score": score,
+        "snippet": payload.get("text"),
+        "chunk_type": payload.get("chunk_type", "statement"),
+        "offset": payload.get("offset", 0),
+        "length": payload.get("length", 0),
+    }
+    if vector is not None:
+        hit["vector"] = vector
+    return hit
 
 
 def qdrant_search(
@@ -196,39 +818,189 @@ def qdrant_search(
     tags: list[str] | None = None,
     chunk_type: str | None = None,
     limit: int = 10,
+    score_threshold: float | None = None,
+    with_vectors: bool = False,
 ) -> list[dict]:
+    if local_index is not None:
+        with span("qdrant"):
+            rows = local_index.search(
+                vector,
+                difficulty=difficulty,
+                tags=tags,
+                chunk_type=chunk_type,
+                limit=limit,
+                score_threshold=score_threshold,
+            )
+        return [
+            _hit(
+                local_index.payload(row),
+                score,
+                local_index.vector(row) if with_vectors else None,
+            )
+            for row, score in rows
+        ]
+
+    from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
+
     must = []
     if difficulty:
-        must.append(FieldCondition(key="difficulty", match=MatchValue(value=difficulty)))
+        must.append(
+            FieldCondition(key="difficulty", match=MatchValue(value=difficulty))
+        )
     if tags:
         must.append(FieldCondition(key="tags", match=MatchAny(any=tags)))
     if chunk_type:
-        must.append(FieldCondition(key="chunk_type", match=MatchValue(value=chunk_type)))
+        must.append(
+            FieldCondition(key="chunk_type", match=MatchValue(value=chunk_type))
+        )
 
     q_filter = Filter(must=must) if must else None
 
     assert qdrant is not None
-    hits = qdrant.query_points(
-        collection_name=COLLECTION,
-        query=vector,
-        query_filter=q_filter,
-        limit=limit,
-        with_payload=True,
-    ).points
-
-    results = []
-    for h in hits:
-        p = h.payload
-        if p is None:
-            continue
-        results.append(
-            {
-                "problem_id": p["problem_id"],
-                "title": p["title"],
-                "difficulty": p.get("difficulty", ""),
-                "tags": p.get("tags", []),
-                "score": h.score,
-                "snippet": p.get("text", ""),
-            }
+    with span("qdrant"), breaker("qdrant", _qdrant_outage):
+        hits = qdrant.query_points(
+            collection_name=COLLECTION,
+            query=vector,
+            query_filter=q_filter,
+            limit=limit,
+            score_threshold=score_threshold,
+            with_payload=True,
+            with_vectors=with_vectors,
+        ).points
+
+    return [
+        _hit(h.payload, h.score, h.vector if with_vectors else None)
+        for h in hits
+        if h.payload is not None
+    ]
+
+
+def _problem_filter(problem_id: int):
+    from qdrant_client.models import FieldCondition, MatchValue
+
+    return FieldCondition(key="problem_id", match=MatchValue(value=problem_id))
+
+
+def problem_vectors(problem_id: int) -> np.ndarray:
+    if local_index is not None:
+        with span("qdrant"):
+            return local_index.problem_vectors(problem_id)
+
+    from qdrant_client.models import Filter
+
+    assert qdrant is not None
+    with span("qdrant"), breaker("qdrant", _qdrant_outage):
+        records, _ = qdrant.scroll(
+            COLLECTION,
+            scroll_filter=Filter(must=[_problem_filter(problem_id)]),
+            limit=1024,
+            with_payload=False,
+            with_vectors=True,
         )
-    return results
+    return np.asarray([r.vector for r in records], dtype=np.float32).reshape(
+        -1, VECTOR_DIM
+    )
+
+
+# Chunk vectors of several problems from one scroll, keyed by problem id. Problems
+# without vectors are missing from the result.
+def problems_vectors(problem_ids: list[int]) -> dict[int, np.ndarray]:
+    if local_index is not None:
+        with span("qdrant"):
+            return local_index.problems_vectors(problem_ids)
+
+    from qdrant_client.models import FieldCondition, Filter, MatchAny
+
+    assert qdrant is not None
+    scroll_filter = Filter(
+        must=[FieldCondition(key="problem_id", match=MatchAny(any=problem_ids))]
+    )
+    grouped: dict[int, list] = {}
+    offset = None
+    with span("qdrant"), breaker("qdrant", _qdrant_outage):
+        while True:
+            records, offset = qdrant.scroll(
+                COLLECTION,
+                scroll_filter=scroll_filter,
+                limit=1024,
+                offset=offset,
+                with_payload=["problem_id"],
+                with_vectors=True,
+            )
+            for r in records:
+                if r.payload is not None:
+                    grouped.setdefault(r.payload["problem_id"], []).append(r.vector)
+            if offset is None:
+                break
+    return {
+        problem_id: np.asarray(vectors, dtype=np.float32).reshape(-1, VECTOR_DIM)
+        for problem_id, vectors in grouped.items()
+    }
+
+
+# Nearest problems to `vector`, scored by their best-matching chunk.
+def search_problems(
+    vector: np.ndarray, limit: int = 10, exclude: int | None = None
+) -> list[tuple[int, float]]:
+    if local_index is not None:
+        with span("qdrant"):
+            return local_index.search_problems(vector, limit=limit, exclude=exclude)
+
+    from qdrant_client.models import Filter
+
+    assert qdrant is not None
+    with span("qdrant"), breaker("qdrant", _qdrant_outage):
+        groups = qdrant.query_points_groups(
+            COLLECTION,
+            group_by="problem_id",
+            query=vector.tolist(),
+            query_filter=Filter(must_not=[_problem_filter(exclude)])
+            if exclude is not None
+            else None,
+            limit=limit,
+            group_size=1,
+            with_payload=False,
+        ).groups
+    return [(int(g.id), g.hits[0].score) for g in groups if g.hits]
+
+
+def count_points() -> int:
+    if local_index is not None:
+        local_index.refresh()
+        return len(local_index)
+    assert qdrant is not None
+    with breaker("qdrant", _qdrant_outage):
+        return qdrant.get_collection(COLLECTION).points_count or 0
+
+
+async def hydrate_hits(hits: list[dict], query: str) -> list[dict]:
+    pending = [h for h in hits if h["snippet"] is None]
+    if not pending:
+        return hits
+
+    assert pg_pool is not None
+    with span("postgres"):
+        async with pg_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT h.idx, p.title, p.difficulty, p.tags,
+                       substr(CASE h.chunk_type WHEN 'editorial' THEN p.editorial
+                                                ELSE p.statement END,
+                              h.chunk_offset + 1, h.chunk_length) AS text
+                FROM unnest($1::int[], $2::text[], $3::int[], $4::int[])
+                     WITH ORDINALITY AS h(problem_id, chunk_type, chunk_offset, chunk_length, idx)
+                JOIN problems p ON p.problem_id = h.problem_id
+                """,
+                [h["problem_id"] for h in pending],
+                [h["chunk_type"] for h in pending],
+                [h["offset"] for h in pending],
+                [h["length"] for h in pending],
+            )
+
+    for r in rows:
+        h = pending[r["idx"] - 1]
+        h["title"] = r["title"]
+        h["difficulty"] = r["difficulty"]
+        h["tags"] = list(r["tags"]) if r["tags"] else []
+        h["snippet"] = query_window(r["text"] or "", query)
+    return [h for h in hits if h["snippet"] is not None]
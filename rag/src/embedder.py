@@ -1,23 +1,166 @@
-from openai import OpenAI
+from __future__ import annotations
 
-from .config import settings
+import asyncio
+import logging
+import time
+from contextlib import nullcontext
+from functools import cache
+from typing import TYPE_CHECKING
 
-_client: OpenAI | None = None
-BATCH_SIZE = 100
+from .config import get_settings
+from .resilience import breaker
+from .tracing import span
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+_client: AsyncOpenAI | None = None
+_inflight: asyncio.Semaphore | None = None
+
+# OpenAI limits for /v1/embeddings.
+MAX_INPUT_TOKENS = 8191
+MAX_BATCH_INPUTS = 2048
+# Fallback estimate without tiktoken. English text averages ~4 bytes per token and
+# code fewer; 3 overestimates, so batches planned from it stay under the limits.
+BYTES_PER_TOKEN = 3
+
+# Cumulative for this process; /health reports it.
+usage = {"requests": 0, "texts": 0, "tokens": 0, "cost_usd": 0.0}
+
+
+def _get_client() -> AsyncOpenAI:
+    from openai import AsyncOpenAI
 
-def _get_client() -> OpenAI:
     global _client
     if _client is None:
-        _client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        settings = get_settings()
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            timeout=settings.OPENAI_TIMEOUT,
+            max_retries=1,
+        )
     return _client
 
 
-def embed_texts(texts: list[str]) -> list[list[float]]:
+# Shared by every caller in the process, so concurrent loads respect one in-flight cap.
+# Single-text calls (/search queries) bypass it: they must not queue behind ingest
+# batches, and the number of requests in flight already bounds them.
+def _get_inflight() -> asyncio.Semaphore:
+    global _inflight
+    if _inflight is None:
+        _inflight = asyncio.Semaphore(get_settings().EMBEDDING_CONCURRENCY)
+    return _inflight
+
+
+def _is_outage(exc: BaseException) -> bool:
+    import openai
+
+    return isinstance(
+        exc,
+        (openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError),
+    )
+
+
+# ── Tokens ──
+
+
+@cache
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model(get_settings().EMBEDDING_MODEL)
+    except Exception as e:  # not installed, unknown model, or BPE file not downloadable
+        logger.info("tiktoken unavailable (%s); estimating tokens from byte length", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc is None:
+        return len(text.encode()) // BYTES_PER_TOKEN + 1
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def _truncate(text: str, tokens: int) -> str:
+    logger.warning(
+        "Truncating embedding input from ~%d to %d tokens", tokens, MAX_INPUT_TOKENS
+    )
+    enc = _encoding()
+    if enc is None:
+        return text.encode()[: MAX_INPUT_TOKENS * BYTES_PER_TOKEN].decode(
+            errors="ignore"
+        )
+    return enc.decode(enc.encode(text, disallowed_special=())[:MAX_INPUT_TOKENS])
+
+
+# Packs inputs, in order, into batches under the per-request token and input limits.
+def plan_batches(texts: list[str], max_tokens: int) -> tuple[list[list[str]], int]:
+    batches: list[list[str]] = []
+    batch: list[str] = []
+    batch_tokens = 0
+    total = 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if tokens > MAX_INPUT_TOKENS:
+            text = _truncate(text, tokens)
+            tokens = MAX_INPUT_TOKENS
+        if batch and (
+            batch_tokens + tokens > max_tokens or len(batch) == MAX_BATCH_INPUTS
+        ):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+        total += tokens
+    if batch:
+        batches.append(batch)
+    return batches, total
+
+
+# ── Embedding ──
+
+
+async def _embed_batch(
+    batch: list[str], capped: bool = True
+) -> tuple[list[list[float]], int]:
     client = _get_client()
-    all_embeddings: list[list[float]] = []
-    for i in range(0, len(texts), BATCH_SIZE):
-        batch = texts[i : i + BATCH_SIZE]
-        resp = client.embeddings.create(input=batch, model=settings.EMBEDDING_MODEL)
-        all_embeddings.extend([d.embedding for d in resp.data])
-    return all_embeddings
+    async with _get_inflight() if capped else nullcontext():
+        with breaker("openai", _is_outage):
+            resp = await client.embeddings.create(
+                input=batch, model=get_settings().EMBEDDING_MODEL
+            )
+    return [d.embedding for d in resp.data], resp.usage.total_tokens
+
+
+async def embed_texts(texts: list[str]) -> list[list[float]]:
+    if not texts:
+        return []
+    settings = get_settings()
+    with span("embed"):
+        start = time.perf_counter()
+        batches, _ = plan_batches(texts, settings.EMBEDDING_BATCH_TOKENS)
+        # gather keeps results in batch order; the semaphore caps requests in flight.
+        capped = len(texts) > 1
+        results = await asyncio.gather(*(_embed_batch(b, capped) for b in batches))
+        elapsed = time.perf_counter() - start
+
+    tokens = sum(t for _, t in results)
+    cost = tokens * settings.EMBEDDING_PRICE_PER_MTOK / 1_000_000
+    usage["requests"] += len(batches)
+    usage["texts"] += len(texts)
+    usage["tokens"] += tokens
+    usage["cost_usd"] += cost
+    logger.log(
+        logging.INFO if len(texts) > 1 else logging.DEBUG,
+        "Embedded %d texts in %d batches: %d tokens, %.2f s, %.0f tokens/s, $%.6f",
+        len(texts),
+        len(batches),
+        tokens,
+        elapsed,
+        tokens / elapsed if elapsed else 0.0,
+        cost,
+    )
+    return [vector for vectors, _ in results for vector in vectors]
@@ -1,11 +1,20 @@
+import logging
+
+import numpy as np
+
 from .chunker import chunk_problem
 from .db import qdrant_upsert_chunks, upsert_problem
 from .embedder import embed_texts
 from .models import ParserProblem, Problem
+from .neighbors import update_neighbors
+from .resilience import UpstreamUnavailable
+from .tracing import span
 
+logger = logging.getLogger(__name__)
 
-async def index_problem(pp: ParserProblem) -> int:
-    problem = Problem(
+
+def _problem(pp: ParserProblem) -> Problem:
+    return Problem(
         problem_id=pp.problem_id,
         slug=pp.slug,
         title=pp.title,
@@ -15,12 +24,35 @@ async def index_problem(pp: ParserProblem) -> int:
         editorial=pp.editorial or None,
         url=f"https://leetcode.com/problems/{pp.slug}/",
     )
-    await upsert_problem(problem)
 
-    chunks = chunk_problem(problem)
-    if chunks:
-        texts = [c.text for c in chunks]
-        vectors = embed_texts(texts)
-        qdrant_upsert_chunks(chunks, vectors)
 
-    return problem.problem_id
+async def index_problem(pp: ParserProblem) -> int:
+    return (await index_problems([pp]))[0]
+
+
+# One embed_texts call for every chunk of every problem, so batches pack across
+# problems and run EMBEDDING_CONCURRENCY at a time; one problem alone rarely fills more
+# than a batch or two.
+async def index_problems(pps: list[ParserProblem]) -> list[int]:
+    problems = [_problem(pp) for pp in pps]
+    for problem in problems:
+        await upsert_problem(problem)
+
+    with span("chunking"):
+        chunked = [chunk_problem(problem) for problem in problems]
+    vectors = await embed_texts([c.text for chunks in chunked for c in chunks])
+
+    start = 0
+    for problem, chunks in zip(problems, chunked):
+        if not chunks:
+            continue
+        problem_vectors = vectors[start : start + len(chunks)]
+        start += len(chunks)
+        qdrant_upsert_chunks(chunks, problem_vectors)
+        try:
+            await update_neighbors(problem.problem_id, np.asarray(problem_vectors))
+        except UpstreamUnavailable:
+            # Derived data: /similar computes it on demand, the batch job backfills it.
+            logger.warning("Skipped neighbor update for problem %s", problem.problem_id)
+
+    return [problem.problem_id for problem in problems]
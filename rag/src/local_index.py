@@ -0,0 +1,286 @@
+import fcntl
+import json
+import os
+import threading
+from collections.abc import Callable
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Concatenate
+
+import numpy as np
+
+FILTER_KEYS = ("difficulty", "tags", "chunk_type")
+DENSE_MASK_RATIO = 0.25
+
+
+# Serializes a method on the instance lock. Snapshot export/import drive the index from
+# a worker thread while /search uses it on the event loop.
+def _synchronized[**P, R](
+    method: Callable[Concatenate["LocalIndex", P], R],
+) -> Callable[Concatenate["LocalIndex", P], R]:
+    @wraps(method)
+    def wrapper(self: "LocalIndex", *args: P.args, **kwargs: P.kwargs) -> R:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+# Exact cosine index: memory-mapped float32 vectors plus an append-only payload log.
+# Row i of vectors.f32 belongs to the i-th point line of log.jsonl. The log is written
+# after the vectors, so a row becomes visible only once its log line is complete;
+# other processes pick up new rows on the next refresh(). A delete line
+# {"delete": problem_id, "before": row} retires that problem's rows below `row`.
+class LocalIndex:
+    def __init__(self, path: str | Path, dim: int) -> None:
+        self.dim = dim
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.dir / "vectors.f32"
+        self._log_path = self.dir / "log.jsonl"
+        self._lock_path = self.dir / "write.lock"
+        self._vectors_path.touch()
+        self._log_path.touch()
+
+        self._vectors: np.ndarray = np.empty((0, dim), dtype=np.float32)
+        self._problem_ids = np.empty(0, dtype=np.int64)
+        self._payloads: list[dict] = []
+        self._live = np.empty(0, dtype=bool)
+        self._dead = 0
+        self._ids: list[str] = []
+        self._live_ids: set[str] = set()
+        self._masks: dict[tuple[str, str], np.ndarray] = {}
+        self._log_pos = 0
+        # Held by refresh, append and the whole-index reads. point_id/payload/vector
+        # only touch rows that already exist, which later refreshes never move.
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._payloads) - self._dead
+
+    def __contains__(self, point_id: str) -> bool:
+        return point_id in self._live_ids
+
+    def live_rows(self) -> np.ndarray:
+        return np.flatnonzero(self._live)
+
+    # ── Writes ──
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self._lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # With replace=problem_id, that problem's earlier rows are retired in the same write.
+    @_synchronized
+    def append(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict],
+        replace: int | None = None,
+    ) -> None:
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+
+        with self._write_lock():
+            self.refresh()
+            rows = len(self._payloads)
+            with open(self._vectors_path, "r+b") as f:
+                # Drop vectors left behind by a writer that died before logging them.
+                f.truncate(rows * self.dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._log_path, "r+b") as f:
+                # Same for a torn last log line: the next record must start on its own line.
+                f.truncate(self._log_pos)
+                f.seek(0, os.SEEK_END)
+                for point_id, payload in zip(ids, payloads):
+                    f.write(
+                        json.dumps({"id": point_id, "payload": payload}).encode()
+                        + b"\n"
+                    )
+                if replace is not None:
+                    f.write(
+                        json.dumps({"delete": replace, "before": rows}).encode() + b"\n"
+                    )
+                f.flush()
+                os.fsync(f.fileno())
+        self.refresh()
+
+    # ── Reads ──
+
+    @_synchronized
+    def refresh(self) -> None:
+        if self._log_path.stat().st_size == self._log_pos:
+            return
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_pos)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return
+        lines = [json.loads(line) for line in data[:end].splitlines()]
+        self._log_pos += end
+        records = [r for r in lines if "id" in r]
+        deletes = [r for r in lines if "delete" in r]
+
+        start = len(self._payloads)
+        for r in records:
+            self._ids.append(r["id"])
+            self._live_ids.add(r["id"])
+            self._payloads.append(r["payload"])
+        total = len(self._payloads)
+
+        self._problem_ids = np.concatenate(
+            [
+                self._problem_ids,
+                np.array([r["payload"]["problem_id"] for r in records], dtype=np.int64),
+            ]
+        )
+        self._live = np.concatenate([self._live, np.ones(len(records), dtype=bool)])
+        for d in deletes:
+            before = d["before"]
+            dead = np.flatnonzero(
+                (self._problem_ids[:before] == d["delete"]) & self._live[:before]
+            )
+            self._live[dead] = False
+            self._live_ids.difference_update(self._ids[row] for row in dead)
+            self._dead += len(dead)
+        for mask in self._masks.values():
+            mask.resize(total, refcheck=False)
+        for i, r in enumerate(records, start=start):
+            for key in FILTER_KEYS:
+                values = r["payload"].get(key)
+                if values is None:
+                    continue
+                for value in values if isinstance(values, list) else [values]:
+                    mask = self._masks.get((key, value))
+                    if mask is None:
+                        mask = self._masks[(key, value)] = np.zeros(total, dtype=bool)
+                    mask[i] = True
+
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r", shape=(total, self.dim)
+        )
+
+    def _mask(self, key: str, values: list[str]) -> np.ndarray:
+        mask = np.zeros(len(self._payloads), dtype=bool)
+        for value in values:
+            m = self._masks.get((key, value))
+            if m is not None:
+                mask |= m
+        return mask
+
+    @_synchronized
+    def search(
+        self,
+        vector: list[float],
+        difficulty: str | None = None,
+        tags: list[str] | None = None,
+        chunk_type: str | None = None,
+        problem_id: int | None = None,
+        limit: int = 10,
+        score_threshold: float | None = None,
+    ) -> list[tuple[int, float]]:
+        self.refresh()
+        if len(self) == 0:
+            return []
+
+        mask: np.ndarray | None = None
+        for key, values in (
+            ("difficulty", [difficulty] if difficulty else None),
+            ("tags", tags),
+            ("chunk_type", [chunk_type] if chunk_type else None),
+        ):
+            if values:
+                m = self._mask(key, values)
+                mask = m if mask is None else mask & m
+        if problem_id is not None:
+            m = self._problem_ids == problem_id
+            mask = m if mask is None else mask & m
+        if self._dead:
+            mask = self._live if mask is None else mask & self._live
+
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        rows = None
+        if mask is None:
+            scores = self._vectors @ q
+            candidates = len(scores)
+        else:
+            candidates = int(mask.sum())
+            if candidates == 0:
+                return []
+            if candidates > DENSE_MASK_RATIO * len(mask):
+                # Gathering most rows costs more than scoring all of them.
+                scores = self._vectors @ q
+                scores[~mask] = -np.inf
+            else:
+                rows = np.flatnonzero(mask)
+                scores = self._vectors[rows] @ q
+
+        k = min(limit, candidates)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if score_threshold is not None:
+            top = top[scores[top] >= score_threshold]
+        if rows is not None:
+            return [(int(rows[i]), float(scores[i])) for i in top]
+        return [(int(i), float(scores[i])) for i in top]
+
+    @_synchronized
+    def problem_vectors(self, problem_id: int) -> np.ndarray:
+        self.refresh()
+        return np.asarray(self._vectors[(self._problem_ids == problem_id) & self._live])
+
+    @_synchronized
+    def problems_vectors(self, problem_ids: list[int]) -> dict[int, np.ndarray]:
+        self.refresh()
+        rows = np.flatnonzero(np.isin(self._problem_ids, problem_ids) & self._live)
+        owners = self._problem_ids[rows]
+        return {
+            int(problem_id): np.asarray(self._vectors[rows[owners == problem_id]])
+            for problem_id in np.unique(owners)
+        }
+
+    # Best chunk score per problem, highest first.
+    @_synchronized
+    def search_problems(
+        self, vector: np.ndarray, limit: int = 10, exclude: int | None = None
+    ) -> list[tuple[int, float]]:
+        self.refresh()
+        if len(self) == 0:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        scores = self._vectors @ q
+        best: dict[int, float] = {}
+        for row in np.argsort(-scores):
+            problem_id = int(self._problem_ids[row])
+            if problem_id == exclude or problem_id in best or not self._live[row]:
+                continue
+            best[problem_id] = float(scores[row])
+            if len(best) == limit:
+                break
+        return list(best.items())
+
+    def payload(self, row: int) -> dict:
+        return self._payloads[row]
+
+    def point_id(self, row: int) -> str:
+        return self._ids[row]
+
+    def vector(self, row: int) -> np.ndarray:
+        return np.asarray(self._vectors[row])
@@ -0,0 +1,131 @@
+import bisect
+import math
+import re
+from collections.abc import Iterable
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Prefix matches scanned per query; keeps one-letter prefixes as cheap as long ones.
+PREFIX_SCAN_LIMIT = 128
+# Share of the query's trigrams a title must contain to count as a fuzzy match.
+FUZZY_THRESHOLD = 0.5
+
+
+def normalize(text: str) -> str:
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# Title/slug/ID lookup for autocomplete, entirely in memory.
+#
+#   _keys      sorted (key, problem_id) pairs: the frontend ID, the slug, and every
+#              word suffix of the title ("two sum ii", "sum ii", "ii"), so a bisect
+#              finds prefix matches at the start of any title word
+#   _postings  trigram -> problem ids, for typo-tolerant matches on the title
+class LookupIndex:
+    def __init__(self) -> None:
+        self._problems: dict[int, dict] = {}
+        self._keys: list[tuple[str, int]] = []
+        self._problem_keys: dict[int, set[str]] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._grams: dict[int, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._problems)
+
+    def clear(self):
+        self.__init__()
+
+    def load(self, rows: Iterable[tuple[int, str, str, str]]):
+        self.clear()
+        for problem_id, slug, title, difficulty in rows:
+            self._insert(problem_id, slug, title, difficulty)
+        self._keys = sorted(
+            (key, pid) for pid, keys in self._problem_keys.items() for key in keys
+        )
+
+    def add(self, problem_id: int, slug: str, title: str, difficulty: str):
+        self.remove(problem_id)
+        for key in self._insert(problem_id, slug, title, difficulty):
+            bisect.insort(self._keys, (key, problem_id))
+
+    # Everything but the sorted key array, which add() and load() maintain differently.
+    def _insert(
+        self, problem_id: int, slug: str, title: str, difficulty: str
+    ) -> set[str]:
+        self._problems[problem_id] = {
+            "problem_id": problem_id,
+            "slug": slug,
+            "title": title,
+            "difficulty": difficulty,
+        }
+        words = normalize(title).split()
+        keys = {" ".join(words[i:]) for i in range(len(words))}
+        keys.add(normalize(slug))
+        keys.add(str(problem_id))
+        keys.discard("")
+        self._problem_keys[problem_id] = keys
+
+        grams = trigrams(" ".join(words))
+        self._grams[problem_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(problem_id)
+        return keys
+
+    def remove(self, problem_id: int):
+        if self._problems.pop(problem_id, None) is None:
+            return
+        for key in self._problem_keys.pop(problem_id):
+            i = bisect.bisect_left(self._keys, (key, problem_id))
+            del self._keys[i]
+        for gram in self._grams.pop(problem_id):
+            postings = self._postings[gram]
+            postings.discard(problem_id)
+            if not postings:
+                del self._postings[gram]
+
+    def lookup(self, query: str, limit: int = 10) -> list[dict]:
+        q = normalize(query)
+        if not q:
+            return []
+        # problem_id -> (rank, score, match); lower rank wins, then higher score.
+        found: dict[int, tuple[int, float, str]] = {}
+
+        if q.isdigit() and int(q) in self._problems:
+            found[int(q)] = (0, 1.0, "id")
+
+        start = bisect.bisect_left(self._keys, (q,))
+        for key, problem_id in self._keys[start : start + PREFIX_SCAN_LIMIT]:
+            if not key.startswith(q):
+                break
+            score = len(q) / len(key)
+            best = found.get(problem_id)
+            if best is None or (best[0] == 1 and best[1] < score):
+                found[problem_id] = (1, score, "prefix")
+
+        if len(found) < limit and len(q) >= 3:
+            grams = trigrams(q)
+            need = math.ceil(len(grams) * FUZZY_THRESHOLD)
+            # Any title sharing `need` grams holds at least one of the len - need + 1
+            # rarest, so only their postings are candidates.
+            rarest = [self._postings.get(g, frozenset()) for g in grams]
+            rarest.sort(key=len)
+            candidates = set().union(*rarest[: len(grams) - need + 1])
+            for problem_id in candidates - found.keys():
+                n = len(grams & self._grams[problem_id])
+                if n < need:
+                    continue
+                jaccard = n / (len(grams) + len(self._grams[problem_id]) - n)
+                found[problem_id] = (2, n / len(grams) * 0.8 + jaccard * 0.2, "fuzzy")
+
+        ranked = sorted(
+            found.items(), key=lambda item: (item[1][0], -item[1][1], item[0])
+        )[:limit]
+        return [
+            {**self._problems[problem_id], "score": round(score, 4), "match": match}
+            for problem_id, (_, score, match) in ranked
+        ]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
+logger = logging.getLogger(__name__)
+
+# Serializes migrations across workers that boot at the same time.
+MIGRATION_LOCK_KEY = 4_812_001
+
+# Append-only: version N is PG_MIGRATIONS[N - 1]. Never edit a shipped entry.
+PG_MIGRATIONS: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS problems (
+        problem_id   INTEGER PRIMARY KEY,
+        slug         TEXT NOT NULL UNIQUE,
+        title        TEXT NOT NULL,
+        difficulty   TEXT NOT NULL,
+        tags         TEXT[] DEFAULT '{}',
+        statement    TEXT,
+        editorial    TEXT,
+        url          TEXT,
+        created_at   TIMESTAMP DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_difficulty ON problems(difficulty);
+    CREATE INDEX IF NOT EXISTS idx_tags ON problems USING GIN(tags);
+    CREATE INDEX IF NOT EXISTS idx_slug ON problems(slug);
+    """,
+    """
+    ALTER TABLE problems ADD COLUMN IF NOT EXISTS statement_hash TEXT;
+    ALTER TABLE problems ADD COLUMN IF NOT EXISTS editorial_hash TEXT;
+    """,
+    """
+    ALTER TABLE problems ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('english',
+                coalesce(title, '') || ' ' || coalesce(statement, '') || ' ' || coalesce(editorial, ''))
+        ) STORED;
+    CREATE INDEX IF NOT EXISTS idx_search_tsv ON problems USING GIN(search_tsv);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pending_loads (
+        slug         TEXT PRIMARY KEY,
+        attempts     INTEGER NOT NULL DEFAULT 0,
+        last_error   TEXT,
+        enqueued_at  TIMESTAMP DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS facet_counts (
+        difficulty   TEXT NOT NULL,
+        tag          TEXT NOT NULL,
+        count        INTEGER NOT NULL,
+        PRIMARY KEY (difficulty, tag)
+    );
+    WITH p AS (SELECT problem_id, difficulty, tags FROM problems),
+         t AS (SELECT DISTINCT problem_id, difficulty, tag FROM p, unnest(p.tags) AS tag)
+    INSERT INTO facet_counts (difficulty, tag, count)
+    SELECT '', '', count(*) FROM p
+    UNION ALL SELECT difficulty, '', count(*) FROM p GROUP BY difficulty
+    UNION ALL SELECT '', tag, count(*) FROM t GROUP BY tag
+    UNION ALL SELECT difficulty, tag, count(*) FROM t GROUP BY difficulty, tag
+    ON CONFLICT (difficulty, tag) DO UPDATE SET count = EXCLUDED.count;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS problem_neighbors (
+        problem_id   INTEGER NOT NULL,
+        neighbor_id  INTEGER NOT NULL,
+        score        REAL NOT NULL,
+        PRIMARY KEY (problem_id, neighbor_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_neighbors_rank ON problem_neighbors(problem_id, score DESC);
+    """,
+    """
+    ALTER TABLE pending_loads ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP;
+    """,
+]
+
+
+def _qdrant_v1(client: QdrantClient, collection: str, dim: int):
+    from qdrant_client.models import (
+        Distance,
+        OptimizersConfigDiff,
+        PayloadSchemaType,
+        VectorParams,
+    )
+
+    if not client.collection_exists(collection):
+        client.create_collection(
+            collection_name=collection,
+            vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+            optimizers_config=OptimizersConfigDiff(memmap_threshold=1000),
+        )
+    client.create_payload_index(collection, "difficulty", PayloadSchemaType.KEYWORD)
+    client.create_payload_index(collection, "tags", PayloadSchemaType.KEYWORD)
+    client.create_payload_index(collection, "chunk_type", PayloadSchemaType.KEYWORD)
+
+
+def _qdrant_v2(client: QdrantClient, collection: str, dim: int):
+    from qdrant_client.models import PayloadSchemaType
+
+    # Per-problem vector lookups and group_by="problem_id" for similar problems.
+    client.create_payload_index(collection, "problem_id", PayloadSchemaType.INTEGER)
+
+
+QDRANT_MIGRATIONS: list[Callable[[QdrantClient, str, int], None]] = [
+    _qdrant_v1,
+    _qdrant_v2,
+]
+
+
+async def _current_version(conn: asyncpg.Connection, component: str) -> int:
+    if not await conn.fetchval("SELECT to_regclass('schema_version') IS NOT NULL"):
+        return 0
+    version = await conn.fetchval(
+        "SELECT version FROM schema_version WHERE component = $1", component
+    )
+    return version or 0
+
+
+async def _migrate(conn: asyncpg.Connection, component: str, target: int, apply) -> int:
+    if await _current_version(conn, component) >= target:
+        return target
+
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+    try:
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                component   TEXT PRIMARY KEY,
+                version     INTEGER NOT NULL,
+                applied_at  TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        current = await _current_version(conn, component)
+        for version in range(current + 1, target + 1):
+            async with conn.transaction():
+                await apply(version)
+                await conn.execute(
+                    """
+                    INSERT INTO schema_version (component, version) VALUES ($1, $2)
+                    ON CONFLICT (component) DO UPDATE SET version = $2, applied_at = NOW()
+                    """,
+                    component,
+                    version,
+                )
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+    return target
+
+
+async def migrate_pg(conn: asyncpg.Connection) -> int:
+    async def apply(version: int):
+        await conn.execute(PG_MIGRATIONS[version - 1])
+
+    return await _migrate(conn, "postgres", len(PG_MIGRATIONS), apply)
+
+
+# The Qdrant schema version is tracked in Postgres, so a warm boot costs one Qdrant
+# call. That call catches a lost or fresh Qdrant volume: the recorded version no
+# longer describes it, so every step is replayed (they are all idempotent).
+async def migrate_qdrant(
+    conn: asyncpg.Connection, client: QdrantClient, collection: str, dim: int
+) -> int:
+    component = f"qdrant:{collection}"
+
+    async def apply(version: int):
+        QDRANT_MIGRATIONS[version - 1](client, collection, dim)
+
+    try:
+        exists = client.collection_exists(collection)
+    except Exception as e:  # Qdrant down: boot anyway, /search falls back to lexical
+        logger.warning("Skipping the Qdrant collection check: %s", e)
+        exists = True
+    if not exists and await _current_version(conn, component):
+        logger.warning("Qdrant collection %s is missing; recreating it", collection)
+        await conn.execute("DELETE FROM schema_version WHERE component = $1", component)
+    return await _migrate(conn, component, len(QDRANT_MIGRATIONS), apply)
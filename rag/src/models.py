@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ParserProblem(BaseModel):
@@ -26,6 +26,10 @@ class LoadProblemRequest(BaseModel):
     slug: str
 
 
+class LoadProblemsRequest(BaseModel):
+    slugs: list[str] = Field(min_length=1, max_length=100)
+
+
 class SearchRequest(BaseModel):
     model_config = {
         "json_schema_extra": {
@@ -43,6 +47,9 @@ class SearchRequest(BaseModel):
     tags: list[str] | None = None
     chunk_type: str | None = None
     limit: int = 10
+    mmr_lambda: float | None = Field(None, ge=0.0, le=1.0)
+    fetch_multiplier: int = Field(4, ge=1, le=20)
+    score_threshold: float | None = None
 
 
 class SearchResult(BaseModel):
@@ -63,6 +70,36 @@ class ProblemListItem(BaseModel):
     url: str | None = None
 
 
+class ProblemLookupItem(BaseModel):
+    problem_id: int
+    slug: str
+    title: str
+    difficulty: str
+    score: float
+    match: str
+
+
+class SimilarProblem(BaseModel):
+    problem_id: int
+    slug: str
+    title: str
+    difficulty: str
+    tags: list[str] = []
+    score: float
+
+
+class ProblemFacets(BaseModel):
+    total: int
+    difficulty: dict[str, int]
+    tags: dict[str, int]
+    difficulty_tags: dict[str, dict[str, int]]
+
+
+class ProblemPage(BaseModel):
+    items: list[ProblemListItem]
+    facets: ProblemFacets
+
+
 class Chunk(BaseModel):
     problem_id: int
     title: str
@@ -70,3 +107,4 @@ class Chunk(BaseModel):
     tags: list[str] = []
     chunk_type: str
     text: str
+    offset: int = 0
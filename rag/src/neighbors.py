@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from . import db
+
+# Neighbors kept per problem; /problems/{id}/similar can return at most this many.
+NEIGHBORS_K = 20
+
+
+def centroid(vectors: np.ndarray) -> np.ndarray | None:
+    if len(vectors) == 0:
+        return None
+    vectors = vectors / np.maximum(
+        np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12
+    )
+    c = vectors.mean(axis=0)
+    return c / max(float(np.linalg.norm(c)), 1e-12)
+
+
+# Problems whose chunks lie closest to the centroid of this problem's chunk vectors.
+# Uses stored vectors only: no embedding call.
+def compute_neighbors(
+    problem_id: int, vectors: np.ndarray | None = None, k: int = NEIGHBORS_K
+) -> list[tuple[int, float]] | None:
+    if vectors is None:
+        vectors = db.problem_vectors(problem_id)
+    c = centroid(np.asarray(vectors, dtype=np.float32))
+    if c is None:
+        return None
+    return db.search_problems(c, limit=k, exclude=problem_id)
+
+
+# How `vectors` (one problem's chunks) score on each neighbor's own list: the best
+# chunk against that neighbor's centroid, the same measure compute_neighbors uses there.
+# `neighbor_vectors` maps neighbor id to its chunk vectors (db.problems_vectors).
+def reverse_scores(
+    vectors: np.ndarray,
+    neighbor_ids: list[int],
+    neighbor_vectors: dict[int, np.ndarray],
+) -> list[tuple[int, float]]:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(
+        np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12
+    )
+    scores = []
+    for neighbor_id in neighbor_ids:
+        if neighbor_id not in neighbor_vectors:
+            continue
+        c = centroid(neighbor_vectors[neighbor_id])
+        if c is not None:
+            scores.append((neighbor_id, float((vectors @ c).max())))
+    return scores
+
+
+# Qdrant calls block, so they run in a thread. The local index is in-process and
+# cheap, and stays on the loop.
+async def _vector_store(fn, *args):
+    if db.local_index is not None:
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+# With reverse=True the problem is also offered to its neighbors' lists, for the
+# ingest path; /similar fills in one missing list and leaves the others alone.
+async def update_neighbors(
+    problem_id: int, vectors: np.ndarray | None = None, reverse: bool = True
+) -> list[tuple[int, float]] | None:
+    if vectors is None:
+        vectors = await _vector_store(db.problem_vectors, problem_id)
+    neighbors = await _vector_store(compute_neighbors, problem_id, vectors)
+    if neighbors is None:
+        return None
+    reverse_edges = []
+    if reverse and neighbors:
+        neighbor_ids = [n for n, _ in neighbors]
+        neighbor_vectors = await _vector_store(db.problems_vectors, neighbor_ids)
+        reverse_edges = reverse_scores(vectors, neighbor_ids, neighbor_vectors)
+    await db.store_neighbors(problem_id, neighbors, NEIGHBORS_K, reverse_edges)
+    return neighbors
+
+
+async def rebuild_neighbors(k: int = NEIGHBORS_K) -> dict:
+    start = time.perf_counter()
+    problem_ids = await db.get_problem_ids()
+    for problem_id in problem_ids:
+        neighbors = await asyncio.to_thread(compute_neighbors, problem_id, None, k)
+        # Every list is recomputed exactly, so reverse-edge maintenance is unnecessary.
+        await db.store_neighbors(problem_id, neighbors or [], keep=k)
+    return {
+        "problems": len(problem_ids),
+        "k": k,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+# ── CLI ──
+
+
+async def _run(k: int) -> dict:
+    await db.init_pg()
+    await db.init_vector_store()
+    try:
+        return await rebuild_neighbors(k)
+    finally:
+        db.close_vector_store()
+        await db.close_pg()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.neighbors")
+    parser.add_argument("-k", type=int, default=NEIGHBORS_K)
+    args = parser.parse_args()
+    print(asyncio.run(_run(args.k)))
+
+
+if __name__ == "__main__":
+    main()
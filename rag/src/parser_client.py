@@ -1,14 +1,26 @@
 import httpx
 
-from .config import settings
+from .config import get_settings
 from .models import ParserProblem
+from .resilience import breaker
+from .tracing import inject_context, span
+
+
+def _is_outage(exc: BaseException) -> bool:
+    return isinstance(exc, (httpx.TransportError, httpx.HTTPStatusError))
 
 
 async def fetch_problem(slug: str) -> ParserProblem:
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            f"{settings.PARSER_BASE_URL}/problem",
-            json={"slug": slug},
-        )
+    settings = get_settings()
+    async with httpx.AsyncClient(timeout=settings.PARSER_TIMEOUT) as client:
+        with span("parser"), breaker("parser", _is_outage):
+            resp = await client.post(
+                f"{settings.PARSER_BASE_URL}/problem",
+                json={"slug": slug},
+                headers=inject_context({}),
+            )
+            # 5xx means the parser (or LeetCode behind it) is down; 4xx is about this slug.
+            if resp.status_code >= 500:
+                resp.raise_for_status()
         resp.raise_for_status()
         return ParserProblem.model_validate(resp.json())
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def mmr(query: np.ndarray, candidates: np.ndarray, k: int, lambda_: float) -> list[int]:
+    n = len(candidates)
+    k = min(k, n)
+    if k == 0:
+        return []
+
+    # Cosine via raw dot products scaled by norms: avoids normalizing the whole matrix.
+    norms = np.maximum(np.sqrt(np.einsum("ij,ij->i", candidates, candidates)), 1e-12)
+    relevance = (candidates @ query) / (
+        norms * max(float(np.linalg.norm(query)), 1e-12)
+    )
+
+    selected: list[int] = []
+    max_sim = np.zeros(n, dtype=relevance.dtype)
+    available = np.ones(n, dtype=bool)
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = lambda_ * relevance - (1.0 - lambda_) * max_sim
+        scores[~available] = -np.inf
+        j = int(np.argmax(scores))
+        selected.append(j)
+        available[j] = False
+        sim_j = (candidates @ candidates[j]) / (norms * norms[j])
+        if step == 0:
+            max_sim = sim_j
+        else:
+            np.maximum(max_sim, sim_j, out=max_sim)
+    return selected
+
+
+def mmr_rerank(
+    query_vector: list[float], hits: list[dict], k: int, lambda_: float
+) -> list[dict]:
+    if not hits:
+        return hits
+    query = np.asarray(query_vector, dtype=np.float32)
+    candidates = np.asarray([h.pop("vector") for h in hits], dtype=np.float32)
+    return [hits[i] for i in mmr(query, candidates, k, lambda_)]
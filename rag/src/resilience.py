@@ -0,0 +1,131 @@
+import time
+from collections.abc import Callable
+
+from .config import get_settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    def __init__(self, dependency: str, detail: str = "") -> None:
+        self.dependency = dependency
+        super().__init__(f"{dependency} unavailable{': ' + detail if detail else ''}")
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    def __init__(self, dependency: str, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__(dependency, "circuit open")
+
+
+def _always(exc: BaseException) -> bool:
+    return True
+
+
+# Used as a context manager around one upstream call (works across awaits):
+#
+#     with breaker("parser"):
+#         resp = await client.post(...)
+#
+# Entering an open breaker raises CircuitOpenError at once. Exceptions for which
+# is_failure() is true count towards opening and are re-raised as
+# UpstreamUnavailable; other exceptions (bad input, 4xx) pass through untouched.
+# BaseExceptions such as CancelledError pass through without being recorded.
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        is_failure: Callable[[BaseException], bool] = _always,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = CLOSED
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == OPEN
+            and time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        return self.state != OPEN
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = CLOSED
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._probing = False
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+
+    def __enter__(self) -> "CircuitBreaker":
+        state = self.state
+        if state == OPEN:
+            retry_after = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(self.name, max(retry_after, 0.0))
+        if state == HALF_OPEN:
+            # This call is the single trial; others keep failing fast until it resolves.
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+            self._probing = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if isinstance(exc, UpstreamUnavailable):
+            return False
+        if exc is not None and not isinstance(exc, Exception):
+            # Cancelled (client disconnect, timeout) or shutting down: the dependency
+            # never answered, so this is neither outcome. A cancelled trial frees the
+            # slot for the next caller instead of leaving the breaker open.
+            if self._probing:
+                self._probing = False
+                self._state = HALF_OPEN
+            return False
+        if exc is None or not self.is_failure(exc):
+            # The dependency answered, even if it rejected this particular call.
+            self.record_success()
+            return False
+        self.record_failure()
+        raise UpstreamUnavailable(self.name, str(exc)) from exc
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def breaker(
+    name: str, is_failure: Callable[[BaseException], bool] | None = None
+) -> CircuitBreaker:
+    b = _breakers.get(name)
+    if b is None:
+        settings = get_settings()
+        b = _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+        )
+    if is_failure is not None:
+        b.is_failure = is_failure
+    return b
+
+
+def breaker_states() -> dict[str, dict]:
+    return {name: b.snapshot() for name, b in _breakers.items()}
@@ -0,0 +1,21 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from .tracing import span
+
+SEARCH_RESULT_FIELDS = ("problem_id", "title", "difficulty", "tags", "score", "snippet")
+
+
+# For hot endpoints: the content is already shaped like the route's response_model,
+# which then only documents the schema (FastAPI does not re-validate a returned
+# Response). Encoding goes straight from dicts to bytes in pydantic-core.
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return to_json(content)
+
+
+def search_results(hits: list[dict]) -> list[dict]:
+    return [{field: h[field] for field in SEARCH_RESULT_FIELDS} for h in hits]
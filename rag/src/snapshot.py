@@ -0,0 +1,230 @@
+import argparse
+import asyncio
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from collections.abc import AsyncIterator, Iterator
+
+import numpy as np
+
+from . import db
+from .config import get_settings
+
+FORMAT_VERSION = 1
+BATCH_SIZE = 1024
+UPLOAD_PARALLEL = 4
+
+PROBLEM_COLUMNS = (
+    "problem_id",
+    "slug",
+    "title",
+    "difficulty",
+    "tags",
+    "statement",
+    "editorial",
+    "url",
+    "statement_hash",
+    "editorial_hash",
+)
+
+# Snapshot layout (a single zip file):
+#   manifest.json   format version, vector dim, embedding model, counts
+#   problems.jsonl  one `problems` row per line
+#   points.jsonl    one {"id", "payload"} per chunk vector, same order as vectors.f32
+#   vectors.f32     raw little-endian float32 rows, VECTOR_DIM wide
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+# ── Export ──
+
+
+def _problem_lines(rows) -> bytes:
+    lines = []
+    for row in rows:
+        record = dict(row)
+        record["tags"] = list(record["tags"] or [])
+        lines.append(json.dumps(record).encode() + b"\n")
+    return b"".join(lines)
+
+
+# Rows are fetched on the event loop; deflate and file writes run in a thread.
+async def _export_problems(zf: zipfile.ZipFile) -> int:
+    count = 0
+    assert db.pg_pool is not None
+    async with db.pg_pool.acquire() as conn, conn.transaction():
+        out = await asyncio.to_thread(zf.open, "problems.jsonl", "w", force_zip64=True)
+        try:
+            query = (
+                f"SELECT {', '.join(PROBLEM_COLUMNS)} FROM problems ORDER BY problem_id"
+            )
+            cursor = await conn.cursor(query)
+            while rows := await cursor.fetch(BATCH_SIZE):
+                await asyncio.to_thread(out.write, _problem_lines(rows))
+                count += len(rows)
+        finally:
+            await asyncio.to_thread(out.close)
+    return count
+
+
+def _export_points(zf: zipfile.ZipFile) -> int:
+    count = 0
+    with tempfile.TemporaryFile() as points:
+        # Float vectors barely compress; store them as-is.
+        info = zipfile.ZipInfo("vectors.f32")
+        info.compress_type = zipfile.ZIP_STORED
+        with zf.open(info, "w", force_zip64=True) as out:
+            for ids, vectors, payloads in db.iter_points(BATCH_SIZE):
+                out.write(np.ascontiguousarray(vectors, dtype="<f4").tobytes())
+                for point_id, payload in zip(ids, payloads):
+                    points.write(
+                        json.dumps({"id": point_id, "payload": payload}).encode()
+                        + b"\n"
+                    )
+                count += len(ids)
+        points.seek(0)
+        with zf.open("points.jsonl", "w", force_zip64=True) as out:
+            shutil.copyfileobj(points, out)
+    return count
+
+
+async def export_snapshot(path: str) -> dict:
+    with zipfile.ZipFile(
+        path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1
+    ) as zf:
+        problems = await _export_problems(zf)
+        points = await asyncio.to_thread(_export_points, zf)
+        manifest = {
+            "format": FORMAT_VERSION,
+            "dim": db.VECTOR_DIM,
+            "embedding_model": get_settings().EMBEDDING_MODEL,
+            "problems": problems,
+            "points": points,
+        }
+        await asyncio.to_thread(
+            zf.writestr, "manifest.json", json.dumps(manifest, indent=2)
+        )
+    return manifest
+
+
+# ── Import ──
+
+
+def _read_manifest(zf: zipfile.ZipFile) -> dict:
+    try:
+        manifest = json.loads(zf.read("manifest.json"))
+    except KeyError as e:
+        raise SnapshotError("Snapshot has no manifest.json") from e
+    if manifest.get("format") != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format: {manifest.get('format')}")
+    if manifest.get("dim") != db.VECTOR_DIM:
+        raise SnapshotError(
+            f"Snapshot vector dim {manifest.get('dim')} != {db.VECTOR_DIM}"
+        )
+    model = get_settings().EMBEDDING_MODEL
+    if manifest.get("embedding_model") != model:
+        raise SnapshotError(
+            f"Snapshot embedded with {manifest.get('embedding_model')}, this node uses {model}"
+        )
+    return manifest
+
+
+async def _problem_records(zf: zipfile.ZipFile) -> AsyncIterator[tuple]:
+    with zf.open("problems.jsonl") as f:
+        for line in io.TextIOWrapper(f, encoding="utf-8"):
+            r = json.loads(line)
+            r["statement_hash"] = r.get("statement_hash") or db.content_hash(
+                r["title"], r["statement"]
+            )
+            r["editorial_hash"] = r.get("editorial_hash") or db.content_hash(
+                r["title"], r["editorial"]
+            )
+            yield tuple(r.get(c) for c in PROBLEM_COLUMNS)
+
+
+async def _import_problems(zf: zipfile.ZipFile):
+    updates = ",\n".join(f"{c} = EXCLUDED.{c}" for c in PROBLEM_COLUMNS[1:])
+    assert db.pg_pool is not None
+    async with db.pg_pool.acquire() as conn, conn.transaction():
+        await conn.execute(
+            "CREATE TEMP TABLE problems_import (LIKE problems INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await conn.copy_records_to_table(
+            "problems_import",
+            records=_problem_records(zf),
+            columns=list(PROBLEM_COLUMNS),
+        )
+        await conn.execute(
+            f"""
+            INSERT INTO problems ({", ".join(PROBLEM_COLUMNS)})
+            SELECT {", ".join(PROBLEM_COLUMNS)} FROM problems_import
+            ON CONFLICT (problem_id) DO UPDATE SET
+            {updates}
+            """
+        )
+        await db.rebuild_facets(conn)
+        await db.notify_problem_changed(conn)
+    db.invalidate_problem_text()
+
+
+def _point_batches(
+    zf: zipfile.ZipFile,
+) -> Iterator[tuple[list[str], np.ndarray, list[dict]]]:
+    row_bytes = db.VECTOR_DIM * 4
+    with zf.open("points.jsonl") as points_file, zf.open("vectors.f32") as vectors_file:
+        points = io.TextIOWrapper(points_file, encoding="utf-8")
+        while True:
+            records = [json.loads(line) for _, line in zip(range(BATCH_SIZE), points)]
+            if not records:
+                return
+            raw = vectors_file.read(len(records) * row_bytes)
+            if len(raw) != len(records) * row_bytes:
+                raise SnapshotError("vectors.f32 is shorter than points.jsonl")
+            vectors = np.frombuffer(raw, dtype="<f4").reshape(
+                len(records), db.VECTOR_DIM
+            )
+            yield [r["id"] for r in records], vectors, [r["payload"] for r in records]
+
+
+def _import_points(zf: zipfile.ZipFile):
+    db.bulk_upsert_points(_point_batches(zf), parallel=UPLOAD_PARALLEL)
+
+
+async def import_snapshot(path: str) -> dict:
+    with zipfile.ZipFile(path) as zf:
+        manifest = _read_manifest(zf)
+        await _import_problems(zf)
+        await asyncio.to_thread(_import_points, zf)
+    return manifest
+
+
+# ── CLI ──
+
+
+async def _run(command: str, path: str) -> dict:
+    await db.init_pg()
+    await db.init_vector_store()
+    try:
+        if command == "export":
+            return await export_snapshot(path)
+        return await import_snapshot(path)
+    finally:
+        db.close_vector_store()
+        await db.close_pg()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.snapshot")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path")
+    args = parser.parse_args()
+    manifest = asyncio.run(_run(args.command, args.path))
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
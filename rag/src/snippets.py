@@ -0,0 +1,32 @@
+import re
+
+SNIPPET_LEN = 500
+MIN_TERM_LEN = 3
+
+_WORD = re.compile(r"\w+")
+
+
+def query_terms(query: str) -> set[str]:
+    return {w.lower() for w in _WORD.findall(query) if len(w) >= MIN_TERM_LEN}
+
+
+def query_window(text: str, query: str, size: int = SNIPPET_LEN) -> str:
+    if len(text) <= size:
+        return text
+    terms = query_terms(query)
+    positions = [m.start() for m in _WORD.finditer(text) if m.group().lower() in terms]
+    if not positions:
+        return text[:size]
+
+    # Densest window of matched terms (two pointers over sorted positions).
+    best_left, best_count = 0, 0
+    left = 0
+    for right, pos in enumerate(positions):
+        while pos - positions[left] >= size:
+            left += 1
+        if right - left + 1 > best_count:
+            best_left, best_count = left, right - left + 1
+
+    start = max(0, positions[best_left] - size // 5)
+    start = min(start, len(text) - size)
+    return text[start : start + size]
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import io
+import pstats
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from fastapi.routing import APIRoute
+
+from .config import get_settings
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.trace import Tracer
+
+_tracer: Tracer | None = None
+_provider: TracerProvider | None = None
+_profiling = False
+
+
+class Timings:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.returned: float | None = None
+        self.spans: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds * 1000
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.spans.items())
+
+
+# Set by TimingMiddleware for requests that asked for timings (or are traced).
+_timings: ContextVar[Timings | None] = ContextVar("timings", default=None)
+
+
+@contextmanager
+def span(name: str):
+    timings = _timings.get()
+    if timings is None and _tracer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        if _tracer is not None:
+            with _tracer.start_as_current_span(name):
+                yield
+        else:
+            yield
+    finally:
+        if timings is not None:
+            timings.add(name, time.perf_counter() - start)
+
+
+# ── OpenTelemetry (optional: uv sync --extra tracing) ──
+
+
+def init_tracing():
+    global _tracer, _provider
+    settings = get_settings()
+    if not settings.OTEL_ENABLED:
+        return
+    from opentelemetry import trace
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    # The exporter reads OTEL_EXPORTER_OTLP_ENDPOINT itself.
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME})
+    )
+    _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer("leetcode-rag")
+
+
+def close_tracing():
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = None
+    _provider = None
+
+
+def inject_context(headers: dict[str, str]) -> dict[str, str]:
+    if _tracer is not None:
+        from opentelemetry.propagate import inject
+
+        inject(headers)
+    return headers
+
+
+# ── Profiling (admin only; pyinstrument if installed, else cProfile) ──
+
+
+class _Profile:
+    def __init__(self) -> None:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            self.pyinstrument = None
+            self.cprofile: cProfile.Profile | None = cProfile.Profile()
+            self.cprofile.enable()
+        else:
+            self.cprofile = None
+            self.pyinstrument = Profiler(async_mode="enabled")
+            self.pyinstrument.start()
+        self.running = True
+
+    def stop(self):
+        global _profiling
+        if not self.running:
+            return
+        self.running = False
+        _profiling = False
+        if self.pyinstrument is not None:
+            self.pyinstrument.stop()
+        elif self.cprofile is not None:
+            self.cprofile.disable()
+
+    def save(self) -> str:
+        self.stop()
+        directory = Path(get_settings().PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}"
+        if self.pyinstrument is not None:
+            name += ".html"
+            (directory / name).write_text(self.pyinstrument.output_html())
+        else:
+            # cProfile sees the whole thread, so concurrent requests show up too.
+            out = io.StringIO()
+            pstats.Stats(self.cprofile, stream=out).sort_stats(
+                "cumulative"
+            ).print_stats(60)
+            name += ".txt"
+            (directory / name).write_text(out.getvalue())
+        return name
+
+
+def _start_profile() -> _Profile | None:
+    global _profiling
+    # One profiler per process: both backends hook the interpreter globally.
+    if _profiling:
+        return None
+    _profiling = True
+    return _Profile()
+
+
+def _is_admin(token: bytes | None) -> bool:
+    admin_token = get_settings().ADMIN_TOKEN
+    if not admin_token or not token:
+        return False
+    return secrets.compare_digest(token, admin_token.encode())
+
+
+# ── ASGI integration ──
+
+
+def _wants_timing(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-timing":
+            return value == b"1"
+    return b"timing=1" in scope["query_string"].split(b"&")
+
+
+def _wants_profile(scope) -> bool:
+    headers = dict(scope["headers"])
+    return headers.get(b"x-profile") == b"1" and _is_admin(
+        headers.get(b"x-admin-token")
+    )
+
+
+# Opt-in per request with `X-Timing: 1` or `?timing=1`; the response then carries
+# a Server-Timing header. `X-Profile: 1` plus a valid X-Admin-Token also profiles
+# the request and returns the stored profile's name in X-Profile.
+class TimingMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timed = _wants_timing(scope)
+        profile = _start_profile() if _wants_profile(scope) else None
+        if not timed and profile is None and _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+
+        async def send_with_timings(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timings.returned is not None:
+                    timings.add("serialize", now - timings.returned)
+                timings.add("total", now - timings.start)
+                extra = []
+                if timed or profile is not None:
+                    extra.append((b"server-timing", timings.header().encode()))
+                if profile is not None:
+                    extra.append((b"x-profile", profile.save().encode()))
+                message["headers"] = [*message.get("headers", ()), *extra]
+            await send(message)
+
+        token = _timings.set(timings)
+        try:
+            if _tracer is None:
+                await self.app(scope, receive, send_with_timings)
+            else:
+                await self._traced(scope, receive, send_with_timings)
+        finally:
+            _timings.reset(token)
+            if profile is not None:
+                profile.stop()
+
+    async def _traced(self, scope, receive, send):
+        from opentelemetry.propagate import extract
+        from opentelemetry.trace import SpanKind
+
+        assert _tracer is not None
+        carrier = {
+            k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+        }
+        method = scope["method"]
+        with _tracer.start_as_current_span(
+            f"{method} {scope['path']}", context=extract(carrier), kind=SpanKind.SERVER
+        ) as server_span:
+            await self.app(scope, receive, send)
+            route = scope.get("route")
+            if route is not None:
+                server_span.update_name(f"{method} {route.path}")
+
+
+def _returned():
+    timings = _timings.get()
+    if timings is not None:
+        timings.returned = time.perf_counter()
+
+
+# Keeps the endpoint's kind: FastAPI awaits coroutine functions and runs plain
+# functions in its threadpool (which copies the context, so _timings is visible).
+def _mark_return(endpoint):
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            _returned()
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        result = endpoint(*args, **kwargs)
+        _returned()
+        return result
+
+    return wrapper
+
+
+# Records when the endpoint returns, so the middleware can attribute the rest
+# (response validation, encoding, rendering) to the "serialize" span.
+class TimedRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs) -> None:
+        super().__init__(path, _mark_return(endpoint), **kwargs)
@@ -0,0 +1,41 @@
+from src.cache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_put_refreshes_existing_key():
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_zero_size_stores_nothing():
+    cache: LRUCache[str, int] = LRUCache(0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_discard_and_clear():
+    cache: LRUCache[str, int] = LRUCache(3)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.discard("a")
+    cache.discard("missing")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from src import db
+from src.config import get_settings
+from src.local_index import LocalIndex
+from src.models import Chunk
+
+DIM = 4
+
+
+def _chunks(problem_id: int, n: int) -> list[Chunk]:
+    return [
+        Chunk(
+            problem_id=problem_id,
+            title="T",
+            difficulty="Easy",
+            tags=["Array"],
+            chunk_type="statement",
+            text="x" * 10,
+            offset=i * 10,
+        )
+        for i in range(n)
+    ]
+
+
+def _vectors(n: int) -> list[list[float]]:
+    return np.random.default_rng(n).standard_normal((n, DIM)).tolist()
+
+
+@pytest.fixture
+def slim(monkeypatch):
+    monkeypatch.setattr(get_settings(), "QDRANT_SLIM_PAYLOAD", True)
+
+
+@pytest.fixture
+def local(monkeypatch, tmp_path) -> LocalIndex:
+    index = LocalIndex(tmp_path, DIM)
+    monkeypatch.setattr(db, "local_index", index)
+    return index
+
+
+def test_slim_payload_has_no_text(slim):
+    payload = db._chunk_payload(_chunks(1, 1)[0])
+    assert "text" not in payload and "title" not in payload
+    assert payload["offset"] == 0 and payload["length"] == 10
+
+
+def test_slim_reload_retires_old_points_local(slim, local):
+    db.qdrant_upsert_chunks(_chunks(1, 3), _vectors(3))
+    db.qdrant_upsert_chunks(_chunks(2, 2), _vectors(2))
+    db.qdrant_upsert_chunks(_chunks(1, 2), _vectors(2))
+    assert len(local) == 4
+    assert db.problem_vectors(1).shape == (2, DIM)
+    assert db.problem_vectors(2).shape == (2, DIM)
+    assert db.count_points() == 4
+
+
+def test_full_payload_reload_keeps_points_local(local):
+    db.qdrant_upsert_chunks(_chunks(1, 3), _vectors(3))
+    db.qdrant_upsert_chunks(_chunks(1, 2), _vectors(2))
+    assert len(local) == 5
+
+
+def test_slim_reload_retires_old_points_qdrant(slim, monkeypatch):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from qdrant_client.models import Distance, VectorParams
+
+    client = qdrant_client.QdrantClient(":memory:")
+    client.create_collection(
+        db.COLLECTION, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE)
+    )
+    monkeypatch.setattr(db, "local_index", None)
+    monkeypatch.setattr(db, "qdrant", client)
+    monkeypatch.setattr(db, "VECTOR_DIM", DIM)
+    db.qdrant_upsert_chunks(_chunks(1, 3), _vectors(3))
+    db.qdrant_upsert_chunks(_chunks(2, 2), _vectors(2))
+    db.qdrant_upsert_chunks(_chunks(1, 2), _vectors(2))
+    assert db.count_points() == 4
+    assert db.problem_vectors(1).shape == (2, DIM)
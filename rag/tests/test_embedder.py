@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src import embedder
+from src.embedder import BYTES_PER_TOKEN, MAX_BATCH_INPUTS, MAX_INPUT_TOKENS
+
+
+@pytest.fixture(autouse=True)
+def byte_estimate(monkeypatch):
+    # Deterministic token counts whether or not tiktoken is installed.
+    monkeypatch.setattr(embedder, "_encoding", lambda: None)
+
+
+def _text(tokens: int) -> str:
+    return "x" * ((tokens - 1) * BYTES_PER_TOKEN)
+
+
+def test_packs_in_order_under_token_budget():
+    texts = [_text(40) + str(i) for i in range(10)]
+    batches, total = embedder.plan_batches(texts, max_tokens=100)
+    assert [t for batch in batches for t in batch] == texts
+    assert [len(b) for b in batches] == [2, 2, 2, 2, 2]
+    assert total == sum(embedder.count_tokens(t) for t in texts)
+
+
+def test_oversized_input_is_truncated_not_rejected():
+    huge = _text(MAX_INPUT_TOKENS * 2)
+    batches, total = embedder.plan_batches(["short", huge], max_tokens=300_000)
+    assert len(batches) == 1
+    assert len(batches[0][1]) <= MAX_INPUT_TOKENS * BYTES_PER_TOKEN
+    assert total == embedder.count_tokens("short") + MAX_INPUT_TOKENS
+
+
+def test_input_count_limit():
+    batches, _ = embedder.plan_batches(["a"] * (MAX_BATCH_INPUTS + 1), 10**9)
+    assert [len(b) for b in batches] == [MAX_BATCH_INPUTS, 1]
+
+
+def test_single_input_over_budget_gets_its_own_batch():
+    batches, _ = embedder.plan_batches(["a", _text(500), "b"], max_tokens=100)
+    assert batches == [["a"], [_text(500)], ["b"]]
+
+
+def test_empty():
+    assert embedder.plan_batches([], 100) == ([], 0)
+
+
+class _Embeddings:
+    async def create(self, input: list[str], model: str):
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[float(len(t))]) for t in input],
+            usage=SimpleNamespace(total_tokens=len(input)),
+        )
+
+
+@pytest.fixture
+def busy(monkeypatch) -> asyncio.Semaphore:
+    monkeypatch.setattr(embedder, "_client", SimpleNamespace(embeddings=_Embeddings()))
+    # Ingest batches hold every slot.
+    inflight = asyncio.Semaphore(1)
+    monkeypatch.setattr(embedder, "_inflight", inflight)
+    return inflight
+
+
+async def test_query_does_not_wait_for_ingest(busy):
+    async with busy:
+        assert await asyncio.wait_for(embedder.embed_texts(["q"]), 1) == [[1.0]]
+
+
+async def test_batches_wait_for_a_slot(busy):
+    async with busy:
+        task = asyncio.create_task(embedder.embed_texts(["a", "bb"]))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+    assert await task == [[1.0], [2.0]]
@@ -0,0 +1,131 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src import db
+from src.db import _apply_facet_delta, _facet_keys
+from src.models import Problem
+
+
+class _Conn:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    async def execute(self, query: str, *args):
+        self.calls.append(args)
+
+
+def _problem(difficulty: str, tags: list[str]) -> Problem:
+    return Problem(problem_id=1, slug="p", title="P", difficulty=difficulty, tags=tags)
+
+
+def test_facet_keys():
+    assert _facet_keys("Easy", ["Array", "Hash Table"]) == {
+        ("", ""),
+        ("Easy", ""),
+        ("", "Array"),
+        ("Easy", "Array"),
+        ("", "Hash Table"),
+        ("Easy", "Hash Table"),
+    }
+    assert _facet_keys("Hard", []) == {("", ""), ("Hard", "")}
+
+
+async def test_delta_for_new_problem_counts_every_key():
+    conn = _Conn()
+    await _apply_facet_delta(conn, None, _problem("Easy", ["Array"]))  # ty: ignore[invalid-argument-type]
+    [(difficulties, tags, counts)] = conn.calls
+    assert list(zip(difficulties, tags, counts)) == [
+        ("", "", 1),
+        ("", "Array", 1),
+        ("Easy", "", 1),
+        ("Easy", "Array", 1),
+    ]
+
+
+async def test_delta_for_changed_problem_moves_counts():
+    conn = _Conn()
+    old = {"difficulty": "Easy", "tags": ["Array", "Sorting"]}
+    await _apply_facet_delta(conn, old, _problem("Medium", ["Array"]))  # ty: ignore[invalid-argument-type]
+    [(difficulties, tags, counts)] = conn.calls
+    changes = list(zip(difficulties, tags, counts))
+    # Sorted, so concurrent upserts lock rows in one order; unchanged keys are skipped.
+    assert changes == sorted(changes)
+    assert changes == [
+        ("", "Sorting", -1),
+        ("Easy", "", -1),
+        ("Easy", "Array", -1),
+        ("Easy", "Sorting", -1),
+        ("Medium", "", 1),
+        ("Medium", "Array", 1),
+    ]
+
+
+async def test_unchanged_problem_writes_nothing():
+    conn = _Conn()
+    old = {"difficulty": "Easy", "tags": ["Array"]}
+    await _apply_facet_delta(conn, old, _problem("Easy", ["Array"]))  # ty: ignore[invalid-argument-type]
+    assert conn.calls == []
+
+
+# facet_counts for Easy [Array, Hash Table], Easy [Array], Hard [Array, Graph].
+FACET_ROWS = [
+    ("", "", 3),
+    ("Easy", "", 2),
+    ("Hard", "", 1),
+    ("", "Array", 3),
+    ("", "Hash Table", 1),
+    ("", "Graph", 1),
+    ("Easy", "Array", 2),
+    ("Easy", "Hash Table", 1),
+    ("Hard", "Array", 1),
+    ("Hard", "Graph", 1),
+    ("Medium", "", 0),
+]
+
+
+class _FacetConn:
+    async def fetch(self, query: str, *args):
+        rows = [r for r in FACET_ROWS if r[2] > 0]
+        if args:
+            assert "difficulty = $1" in query
+            rows = [r for r in rows if r[0] == args[0]]
+        return [{"difficulty": d, "tag": t, "count": c} for d, t, c in rows]
+
+
+class _Pool:
+    @asynccontextmanager
+    async def acquire(self):
+        yield _FacetConn()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(db, "pg_pool", _Pool())
+
+
+async def test_corpus_facets(pool):
+    assert await db.get_facets() == {
+        "total": 3,
+        "difficulty": {"Easy": 2, "Hard": 1},
+        "tags": {"Array": 3, "Hash Table": 1, "Graph": 1},
+        "difficulty_tags": {
+            "Easy": {"Array": 2, "Hash Table": 1},
+            "Hard": {"Array": 1, "Graph": 1},
+        },
+    }
+
+
+async def test_facets_follow_difficulty_filter(pool):
+    assert await db.get_facets("Easy") == {
+        "total": 2,
+        "difficulty": {"Easy": 2},
+        "tags": {"Array": 2, "Hash Table": 1},
+        "difficulty_tags": {"Easy": {"Array": 2, "Hash Table": 1}},
+    }
+    assert await db.get_facets("Medium") == {
+        "total": 0,
+        "difficulty": {},
+        "tags": {},
+        "difficulty_tags": {},
+    }
@@ -0,0 +1,112 @@
+import numpy as np
+
+from src.local_index import LocalIndex
+
+DIM = 4
+
+
+def _payload(problem_id: int, offset: int = 0, **extra) -> dict:
+    return {
+        "problem_id": problem_id,
+        "difficulty": "Easy",
+        "tags": ["Array"],
+        "chunk_type": "statement",
+        "offset": offset,
+        **extra,
+    }
+
+
+def _unit(i: int) -> list[float]:
+    v = [0.0] * DIM
+    v[i] = 1.0
+    return v
+
+
+def _filled(tmp_path) -> LocalIndex:
+    index = LocalIndex(tmp_path, DIM)
+    index.append(
+        ["a", "b", "c"],
+        np.array([_unit(0), _unit(1), [1.0, 1.0, 0.0, 0.0]]),
+        [
+            _payload(1),
+            _payload(2, difficulty="Hard", tags=["Graph"]),
+            _payload(3, chunk_type="editorial"),
+        ],
+    )
+    return index
+
+
+def test_search_ranks_by_cosine(tmp_path):
+    index = _filled(tmp_path)
+    hits = index.search(_unit(0), limit=3)
+    assert [index.point_id(row) for row, _ in hits] == ["a", "c", "b"]
+    assert hits[0][1] == np.float32(1.0)
+    assert abs(hits[1][1] - 2**-0.5) < 1e-6
+
+
+def test_filters(tmp_path):
+    index = _filled(tmp_path)
+    ids = lambda hits: [index.point_id(row) for row, _ in hits]  # noqa: E731
+    assert ids(index.search(_unit(0), difficulty="Hard")) == ["b"]
+    assert ids(index.search(_unit(0), tags=["Graph", "Array"])) == ["a", "c", "b"]
+    assert ids(index.search(_unit(0), chunk_type="editorial")) == ["c"]
+    assert ids(index.search(_unit(0), problem_id=2)) == ["b"]
+    assert index.search(_unit(0), tags=["Missing"]) == []
+    assert ids(index.search(_unit(0), score_threshold=0.5)) == ["a", "c"]
+
+
+def test_other_instance_sees_appends(tmp_path):
+    writer = _filled(tmp_path)
+    reader = LocalIndex(tmp_path, DIM)
+    writer.append(["d"], np.array([_unit(3)]), [_payload(4)])
+    assert len(reader) == 3
+    hits = reader.search(_unit(3), limit=1)
+    assert reader.point_id(hits[0][0]) == "d"
+    assert len(reader) == 4
+
+
+def test_replace_retires_older_rows(tmp_path):
+    index = _filled(tmp_path)
+    index.append(
+        ["a2", "a3"],
+        np.array([_unit(2), _unit(3)]),
+        [_payload(1, offset=0), _payload(1, offset=100)],
+        replace=1,
+    )
+    assert len(index) == 4
+    assert "a" not in index and "a2" in index
+    assert [index.point_id(r) for r, _ in index.search(_unit(0), problem_id=1)] == [
+        "a2",
+        "a3",
+    ]
+    assert index.problem_vectors(1).shape == (2, DIM)
+    assert sorted(index.point_id(r) for r in index.live_rows()) == [
+        "a2",
+        "a3",
+        "b",
+        "c",
+    ]
+    # A reopened index replays the delete record too.
+    assert "a" not in LocalIndex(tmp_path, DIM)
+
+
+def test_search_problems_best_chunk_per_problem(tmp_path):
+    index = _filled(tmp_path)
+    index.append(["b2"], np.array([[0.9, 0.1, 0.0, 0.0]]), [_payload(2)])
+    ranked = index.search_problems(np.array(_unit(0)), limit=2)
+    assert [problem_id for problem_id, _ in ranked] == [1, 2]
+    assert [p for p, _ in index.search_problems(np.array(_unit(0)), exclude=1)] == [
+        2,
+        3,
+    ]
+
+
+def test_torn_log_tail_is_dropped_on_append(tmp_path):
+    index = _filled(tmp_path)
+    with open(tmp_path / "log.jsonl", "ab") as f:
+        f.write(b'{"id": "torn", "payl')
+    index.append(["d"], np.array([_unit(3)]), [_payload(4)])
+    reopened = LocalIndex(tmp_path, DIM)
+    assert len(reopened) == 4
+    assert "torn" not in reopened
+    assert reopened.point_id(reopened.search(_unit(3), limit=1)[0][0]) == "d"
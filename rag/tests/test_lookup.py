@@ -0,0 +1,76 @@
+from src.lookup import LookupIndex, normalize, trigrams
+
+ROWS: list[tuple[int, str, str, str]] = [
+    (1, "two-sum", "Two Sum", "Easy"),
+    (
+        167,
+        "two-sum-ii-input-array-is-sorted",
+        "Two Sum II - Input Array Is Sorted",
+        "Medium",
+    ),
+    (15, "3sum", "3Sum", "Medium"),
+    (200, "number-of-islands", "Number of Islands", "Medium"),
+]
+
+
+def _index() -> LookupIndex:
+    index = LookupIndex()
+    index.load(ROWS)
+    return index
+
+
+def _ids(results: list[dict]) -> list[int]:
+    return [r["problem_id"] for r in results]
+
+
+def test_normalize_and_trigrams():
+    assert normalize("Two Sum II - Input") == "two sum ii input"
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_id_match_ranks_first():
+    results = _index().lookup("15")
+    assert results[0]["problem_id"] == 15
+    assert results[0]["match"] == "id"
+
+
+def test_prefix_on_any_title_word():
+    index = _index()
+    assert _ids(index.lookup("two s")) == [1, 167]
+    assert _ids(index.lookup("islan")) == [200]
+    assert index.lookup("islan")[0]["match"] == "prefix"
+    assert _ids(index.lookup("number-of")) == [200]
+
+
+def test_fuzzy_match_tolerates_typos():
+    results = _index().lookup("nmber of islands")
+    assert _ids(results) == [200]
+    assert results[0]["match"] == "fuzzy"
+    assert _index().lookup("zzzzqqq") == []
+
+
+def test_add_replaces_and_remove_forgets():
+    index = _index()
+    index.add(200, "number-of-islands", "Count Islands", "Medium")
+    assert _ids(index.lookup("number of")) == [200]
+    assert index.lookup("count")[0]["title"] == "Count Islands"
+    index.remove(200)
+    assert index.lookup("count") == []
+    assert index.lookup("200") == []
+    assert len(index) == 3
+    index.remove(200)
+
+
+def test_add_keeps_keys_sorted_like_load():
+    loaded = _index()
+    added = LookupIndex()
+    for row in reversed(ROWS):
+        added.add(*row)
+    assert added._keys == loaded._keys
+    assert added.lookup("two") == loaded.lookup("two")
+
+
+def test_limit_and_empty_query():
+    index = _index()
+    assert len(index.lookup("s", limit=1)) == 1
+    assert index.lookup("  -- ") == []
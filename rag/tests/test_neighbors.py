@@ -0,0 +1,196 @@
+import threading
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from src import db, neighbors
+from src.local_index import LocalIndex
+from src.neighbors import compute_neighbors, reverse_scores, update_neighbors
+
+DIM = 4
+
+E0, E1, E2, E3 = np.eye(DIM, dtype=np.float32)
+
+# problem_id -> chunk vectors. Problem 1 leans towards e0, 2 sits on it, 3 and 4 drift away.
+CHUNKS = {
+    1: [E0 + 0.1 * E1, E0 + 0.1 * E2],
+    2: [E0, E0],
+    3: [E0 + E1, E1],
+    4: [E2, E3],
+    5: [E3, E3],
+}
+
+
+@pytest.fixture
+def local(monkeypatch, tmp_path) -> LocalIndex:
+    index = LocalIndex(tmp_path, DIM)
+    for problem_id, vectors in CHUNKS.items():
+        index.append(
+            [f"{problem_id}-{i}" for i in range(len(vectors))],
+            np.stack(vectors),
+            [{"problem_id": problem_id} for _ in vectors],
+        )
+    monkeypatch.setattr(db, "local_index", index)
+    return index
+
+
+def test_reverse_scores():
+    vectors = np.stack([E0, E1])
+    scores = reverse_scores(
+        vectors,
+        [2, 3, 9],
+        {2: np.stack([E0, 2 * E0]), 3: np.stack([E1, E2])},
+    )
+    # Neighbor 9 has no vectors and is skipped.
+    assert [n for n, _ in scores] == [2, 3]
+    assert scores[0][1] == pytest.approx(1.0)
+    assert scores[1][1] == pytest.approx(2**-0.5)
+
+
+def test_problems_vectors_local(local):
+    local.append(["1-new"], E3[None], [{"problem_id": 1}], replace=1)
+    vectors = db.problems_vectors([1, 3, 99])
+    assert sorted(vectors) == [1, 3]
+    np.testing.assert_allclose(vectors[1], E3[None])
+    assert vectors[3].shape == (2, DIM)
+
+
+def test_problems_vectors_qdrant(monkeypatch):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+
+    client = qdrant_client.QdrantClient(":memory:")
+    client.create_collection(
+        db.COLLECTION, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE)
+    )
+    client.upsert(
+        db.COLLECTION,
+        [
+            PointStruct(id=i, vector=v.tolist(), payload={"problem_id": problem_id})
+            for i, (problem_id, v) in enumerate(
+                (p, v) for p, vs in CHUNKS.items() for v in vs
+            )
+        ],
+    )
+    monkeypatch.setattr(db, "local_index", None)
+    monkeypatch.setattr(db, "qdrant", client)
+    monkeypatch.setattr(db, "VECTOR_DIM", DIM)
+    vectors = db.problems_vectors([2, 4, 99])
+    assert sorted(vectors) == [2, 4]
+    assert vectors[2].shape == vectors[4].shape == (2, DIM)
+
+
+def test_compute_neighbors_keeps_top_k(local):
+    found = compute_neighbors(1, k=2)
+    assert found is not None
+    assert [n for n, _ in found] == [2, 3]
+    assert found[0][1] >= found[1][1]
+    assert compute_neighbors(99) is None
+
+
+async def test_update_neighbors_fetches_neighbors_once(local, monkeypatch):
+    fetches = []
+    stored = []
+    problems_vectors = db.problems_vectors
+
+    def counting_problems_vectors(problem_ids):
+        fetches.append(problem_ids)
+        return problems_vectors(problem_ids)
+
+    async def store_neighbors(problem_id, found, keep, reverse=None):
+        stored.append((problem_id, found, keep, reverse))
+
+    monkeypatch.setattr(db, "problems_vectors", counting_problems_vectors)
+    monkeypatch.setattr(db, "store_neighbors", store_neighbors)
+    vectors = np.stack(CHUNKS[1])
+    found = await update_neighbors(1, vectors)
+    assert found is not None
+    ids = [n for n, _ in found]
+    assert fetches == [ids]
+    [(problem_id, _, keep, reverse)] = stored
+    assert (problem_id, keep) == (1, neighbors.NEIGHBORS_K)
+    expected = reverse_scores(vectors, ids, {n: np.stack(CHUNKS[n]) for n in ids})
+    assert [n for n, _ in reverse] == [n for n, _ in expected]
+    np.testing.assert_allclose([s for _, s in reverse], [s for _, s in expected])
+
+    # /similar fills one list without touching the neighbors'.
+    stored.clear()
+    await update_neighbors(1, reverse=False)
+    assert len(fetches) == 1
+    assert stored[0][3] == []
+
+
+@pytest.mark.parametrize("backend", ["local", "qdrant"])
+async def test_vector_store_calls_leave_the_loop_for_qdrant(
+    local, monkeypatch, backend
+):
+    threads = set()
+
+    def problems_vectors(problem_ids):
+        threads.add(threading.get_ident())
+        return {}
+
+    def search_problems(vector, limit=10, exclude=None):
+        threads.add(threading.get_ident())
+        return [(2, 0.9)]
+
+    async def store_neighbors(*args):
+        pass
+
+    if backend == "qdrant":
+        monkeypatch.setattr(db, "local_index", None)
+    monkeypatch.setattr(db, "problems_vectors", problems_vectors)
+    monkeypatch.setattr(db, "search_problems", search_problems)
+    monkeypatch.setattr(db, "store_neighbors", store_neighbors)
+    await update_neighbors(1, np.stack(CHUNKS[1]))
+    on_loop = threads == {threading.get_ident()}
+    assert on_loop == (backend == "local")
+
+
+class _Conn:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, tuple]] = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, query: str, *args):
+        self.calls.append((" ".join(query.split()), args))
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.conn = _Conn()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+def pool(monkeypatch) -> _Pool:
+    pool = _Pool()
+    monkeypatch.setattr(db, "pg_pool", pool)
+    return pool
+
+
+async def test_store_neighbors_without_reverse(pool):
+    await db.store_neighbors(5, [(2, 0.9), (3, 0.8)], keep=20)
+    [lock, delete, insert] = pool.conn.calls
+    assert lock[1] == (db.NEIGHBORS_LOCK_NS, [5])
+    assert delete == ("DELETE FROM problem_neighbors WHERE problem_id = $1", (5,))
+    assert insert[1] == (5, [2, 3], [0.9, 0.8])
+
+
+async def test_store_neighbors_prunes_reverse_lists(pool):
+    await db.store_neighbors(
+        5, [(7, 0.9), (2, 0.8)], keep=20, reverse=[(7, 0.7), (2, 0.6)]
+    )
+    [lock, _, _, reverse, prune] = pool.conn.calls
+    # Every rewritten list is locked, in id order.
+    assert lock[1] == (db.NEIGHBORS_LOCK_NS, [2, 5, 7])
+    assert reverse[1] == (5, [2, 7], [0.6, 0.7])
+    assert "r.rank > $2" in prune[0]
+    assert prune[1] == ([2, 7], 20)
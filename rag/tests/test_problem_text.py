@@ -0,0 +1,146 @@
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import api, db
+from src.cache import LRUCache
+from src.config import get_settings
+
+TEXT = "Given an array of integers nums and an integer target. " * 40
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    async def get_problem_text(problem_id: int, field: str) -> dict | None:
+        if problem_id != 1:
+            return None
+        return {"problem_id": 1, "title": "Two Sum", "text": TEXT, "content_hash": "h1"}
+
+    monkeypatch.setattr(db, "get_problem_text", get_problem_text)
+    return TestClient(api.app)
+
+
+def test_etag_and_body(client):
+    resp = client.get("/problems/1/statement")
+    assert resp.status_code == 200
+    assert resp.headers["etag"] == 'W/"h1"'
+    assert resp.headers["cache-control"] == "no-cache"
+    assert resp.json() == {"problem_id": 1, "title": "Two Sum", "text": TEXT}
+    assert client.get("/problems/2/statement").status_code == 404
+
+
+@pytest.mark.parametrize(
+    "if_none_match", ['W/"h1"', '"h1"', "*", '"other", W/"h1"', ' "x" ,"h1" ']
+)
+def test_if_none_match_hits(client, if_none_match):
+    resp = client.get("/problems/1/editorial", headers={"If-None-Match": if_none_match})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == 'W/"h1"'
+    assert resp.content == b""
+
+
+@pytest.mark.parametrize("if_none_match", ['"h2"', 'W/"h12"', ""])
+def test_if_none_match_misses(client, if_none_match):
+    resp = client.get("/problems/1/statement", headers={"If-None-Match": if_none_match})
+    assert resp.status_code == 200
+
+
+def test_etag_is_shared_by_gzip_and_identity(client):
+    gzipped = client.get("/problems/1/statement", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/problems/1/statement", headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["etag"] == plain.headers["etag"]
+    assert gzipped.json() == plain.json()
+
+
+def test_snapshot_download_is_not_gzipped(client, monkeypatch, tmp_path):
+    async def export_snapshot(path: str):
+        with open(path, "wb") as f:
+            f.write(b"PK" + b"\0" * 4096)
+
+    monkeypatch.setattr(api, "export_snapshot", export_snapshot)
+    monkeypatch.setattr(get_settings(), "ADMIN_TOKEN", "secret")
+    resp = client.get(
+        "/admin/snapshot",
+        headers={"X-Admin-Token": "secret", "Accept-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "identity"
+    assert resp.content == b"PK" + b"\0" * 4096
+
+
+# ── Text cache ──
+
+
+class _Conn:
+    def __init__(self, release: asyncio.Event | None = None) -> None:
+        self.release = release
+        self.fetches = 0
+
+    async def fetchrow(self, query: str, problem_id: int):
+        self.fetches += 1
+        if self.release is not None:
+            await self.release.wait()
+        return {"problem_id": problem_id, "title": "T", "text": "body", "hash": "h"}
+
+
+class _Pool:
+    def __init__(self, conn: _Conn) -> None:
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+def text_cache(monkeypatch):
+    monkeypatch.setattr(db, "_text_cache", LRUCache(16))
+    monkeypatch.setattr(db, "_text_generation", Counter())
+
+
+async def test_text_is_cached(monkeypatch, text_cache):
+    conn = _Conn()
+    monkeypatch.setattr(db, "pg_pool", _Pool(conn))
+    first = await db.get_problem_text(7, "statement")
+    assert await db.get_problem_text(7, "statement") == first
+    assert conn.fetches == 1
+    db.invalidate_problem_text(7)
+    await db.get_problem_text(7, "statement")
+    assert conn.fetches == 2
+
+
+@pytest.mark.parametrize("invalidated", [7, None])
+async def test_fetch_that_raced_an_invalidation_is_not_cached(
+    monkeypatch, text_cache, invalidated
+):
+    release = asyncio.Event()
+    conn = _Conn(release)
+    monkeypatch.setattr(db, "pg_pool", _Pool(conn))
+    fetch = asyncio.create_task(db.get_problem_text(7, "statement"))
+    await asyncio.sleep(0)
+    # The row changes while the read is in flight; its result may be stale.
+    db.invalidate_problem_text(invalidated)
+    release.set()
+    result = await fetch
+    assert result is not None and result["text"] == "body"
+    assert len(db._text_cache) == 0
+
+    conn.release = None
+    await db.get_problem_text(7, "statement")
+    assert len(db._text_cache) == 1
+
+
+async def test_unrelated_invalidation_still_caches(monkeypatch, text_cache):
+    release = asyncio.Event()
+    monkeypatch.setattr(db, "pg_pool", _Pool(_Conn(release)))
+    fetch = asyncio.create_task(db.get_problem_text(7, "statement"))
+    await asyncio.sleep(0)
+    db.invalidate_problem_text(8)
+    release.set()
+    await fetch
+    assert len(db._text_cache) == 1
@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.rerank import mmr, mmr_rerank
+
+
+def _candidates() -> np.ndarray:
+    # 0 and 1 are near-duplicates close to the query; 2 is less relevant but different.
+    return np.array(
+        [[1.0, 0.1, 0.0], [1.0, 0.12, 0.0], [0.6, 0.0, 0.8]], dtype=np.float32
+    )
+
+
+def test_lambda_one_is_plain_relevance_order():
+    query = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    candidates = _candidates()
+    relevance = candidates @ query / np.linalg.norm(candidates, axis=1)
+    assert mmr(query, candidates, 3, 1.0) == list(np.argsort(-relevance))
+
+
+def test_diversity_skips_near_duplicate():
+    query = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    assert mmr(query, _candidates(), 2, 0.3) == [0, 2]
+
+
+def test_k_is_capped_and_indices_unique():
+    query = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    selected = mmr(query, _candidates(), 10, 0.5)
+    assert sorted(selected) == [0, 1, 2]
+    assert mmr(query, _candidates(), 0, 0.5) == []
+    assert mmr(query, np.empty((0, 3), dtype=np.float32), 5, 0.5) == []
+
+
+def test_scale_invariant():
+    query = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    scaled = _candidates() * np.array([[3.0], [0.5], [7.0]], dtype=np.float32)
+    assert mmr(query, scaled, 3, 0.3) == mmr(query, _candidates(), 3, 0.3)
+
+
+def test_rerank_returns_hits_without_vectors():
+    hits = [
+        {"problem_id": i, "vector": v.tolist()} for i, v in enumerate(_candidates())
+    ]
+    reranked = mmr_rerank([1.0, 0.0, 0.0], hits, 2, 0.3)
+    assert [h["problem_id"] for h in reranked] == [0, 2]
+    assert all("vector" not in h for h in reranked)
+    assert mmr_rerank([1.0, 0.0, 0.0], [], 2, 0.3) == []
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from src import resilience
+from src.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamUnavailable,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def _fail(b: CircuitBreaker, exc: Exception | None = None):
+    with pytest.raises(UpstreamUnavailable):
+        with b:
+            raise exc or ConnectionError("down")
+
+
+def test_opens_after_threshold(clock):
+    b = CircuitBreaker("dep", failure_threshold=2, reset_timeout=10)
+    _fail(b)
+    assert b.state == CLOSED
+    _fail(b)
+    assert b.state == OPEN
+    with pytest.raises(CircuitOpenError) as e:
+        with b:
+            pass
+    assert e.value.retry_after == 10
+
+
+def test_half_open_allows_one_trial(clock):
+    b = CircuitBreaker("dep", failure_threshold=1, reset_timeout=10)
+    _fail(b)
+    clock.now += 10
+    assert b.state == HALF_OPEN
+    with b:
+        # Other callers fail fast while the trial is in flight.
+        with pytest.raises(CircuitOpenError):
+            with b:
+                pass
+    assert b.state == CLOSED
+    assert b.failures == 0
+
+
+def test_failed_trial_reopens(clock):
+    b = CircuitBreaker("dep", failure_threshold=1, reset_timeout=10)
+    _fail(b)
+    clock.now += 10
+    _fail(b)
+    assert b.state == OPEN
+    assert not b.allow()
+
+
+def test_non_failures_pass_through_and_count_as_success(clock):
+    b = CircuitBreaker(
+        "dep",
+        failure_threshold=2,
+        is_failure=lambda exc: isinstance(exc, ConnectionError),
+    )
+    _fail(b)
+    with pytest.raises(ValueError):
+        with b:
+            raise ValueError("bad input")
+    assert b.failures == 0
+    assert b.snapshot() == {"state": CLOSED, "failures": 0}
+
+
+def test_nested_unavailable_is_not_double_counted(clock):
+    b = CircuitBreaker("dep", failure_threshold=1)
+    with pytest.raises(UpstreamUnavailable):
+        with b:
+            raise UpstreamUnavailable("inner")
+    assert b.state == CLOSED
+
+
+def test_registry_shares_breakers(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    b = resilience.breaker("svc")
+    assert resilience.breaker("svc") is b
+    assert resilience.breaker_states() == {"svc": {"state": CLOSED, "failures": 0}}
+
+
+@pytest.mark.parametrize("exc", [asyncio.CancelledError(), KeyboardInterrupt()])
+def test_base_exceptions_are_not_recorded(clock, exc):
+    b = CircuitBreaker("dep", failure_threshold=2)
+    _fail(b)
+    with pytest.raises(type(exc)):
+        with b:
+            raise exc
+    assert b.failures == 1
+    assert b.state == CLOSED
+
+
+def test_cancelled_trial_releases_the_slot(clock):
+    b = CircuitBreaker("dep", failure_threshold=1, reset_timeout=10)
+    _fail(b)
+    clock.now += 10
+    with pytest.raises(asyncio.CancelledError):
+        with b:
+            raise asyncio.CancelledError
+    assert b.state == HALF_OPEN
+    assert b.failures == 1
+    # The next caller gets the trial.
+    with b:
+        pass
+    assert b.state == CLOSED
@@ -0,0 +1,111 @@
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from src import api, db, embedder
+from src.models import ProblemListItem, ProblemPage, SearchResult
+
+HITS = [
+    {
+        "problem_id": 1,
+        "title": "Two Sum",
+        "difficulty": "Easy",
+        "tags": ["Array", "Hash Table"],
+        "score": 0.8612345678901234,
+        "snippet": "Given an array of integers — return indices “i” and “j”.",
+        # Internal fields the response must drop.
+        "chunk_type": "statement",
+        "offset": 0,
+        "length": 120,
+    },
+    {
+        "problem_id": 42,
+        "title": "Trapping Rain Water",
+        "difficulty": "Hard",
+        "tags": [],
+        "score": 0.5,
+        "snippet": 'Quote " and backslash \\ and\nnewline',
+        "chunk_type": "editorial",
+        "offset": 512,
+        "length": 64,
+    },
+]
+
+ROWS = [
+    {
+        "problem_id": 1,
+        "slug": "two-sum",
+        "title": "Two Sum",
+        "difficulty": "Easy",
+        "tags": ["Array"],
+        "url": "https://leetcode.com/problems/two-sum/",
+    },
+    {
+        "problem_id": 2,
+        "slug": "add-two-numbers",
+        "title": "Add Two Numbers",
+        "difficulty": "Medium",
+        "tags": [],
+        "url": None,
+    },
+]
+
+FACETS = {
+    "total": 2,
+    "difficulty": {"Easy": 1, "Medium": 1},
+    "tags": {"Array": 1},
+    "difficulty_tags": {"Easy": {"Array": 1}},
+}
+
+
+# What FastAPI sent before the endpoints returned FastJSONResponse: validate
+# against the response_model, dump in JSON mode, render with JSONResponse.
+def _pydantic_body(model, content) -> bytes:
+    adapter = TypeAdapter(model)
+    return JSONResponse(content=None).render(
+        adapter.dump_python(adapter.validate_python(content), mode="json")
+    )
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    async def embed_texts(texts: list[str]) -> list[list[float]]:
+        return [[0.0] * 4 for _ in texts]
+
+    def qdrant_search(**kwargs) -> list[dict]:
+        return [dict(h) for h in HITS]
+
+    async def hydrate_hits(hits: list[dict], query: str) -> list[dict]:
+        return hits
+
+    async def get_problems(*args, **kwargs) -> list[dict]:
+        return ROWS
+
+    async def get_facets(*args, **kwargs) -> dict:
+        return FACETS
+
+    monkeypatch.setattr(embedder, "embed_texts", embed_texts)
+    monkeypatch.setattr(db, "qdrant_search", qdrant_search)
+    monkeypatch.setattr(db, "hydrate_hits", hydrate_hits)
+    monkeypatch.setattr(db, "get_problems", get_problems)
+    monkeypatch.setattr(db, "get_facets", get_facets)
+    return TestClient(api.app)
+
+
+def test_search_matches_response_model(client):
+    resp = client.post("/search", json={"query": "two sum"})
+    assert resp.status_code == 200
+    assert resp.content == _pydantic_body(list[SearchResult], HITS)
+
+
+def test_problems_matches_response_model(client):
+    resp = client.get("/problems")
+    assert resp.content == _pydantic_body(list[ProblemListItem], ROWS)
+
+
+def test_problem_page_matches_response_model(client):
+    resp = client.get("/problems", params={"facets": "true"})
+    assert resp.content == _pydantic_body(
+        ProblemPage, {"items": ROWS, "facets": FACETS}
+    )
@@ -0,0 +1,171 @@
+import sys
+import threading
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from src import db, snapshot
+from src.local_index import LocalIndex
+
+DIM = 4
+
+PROBLEMS = [
+    {
+        "problem_id": i,
+        "slug": f"p-{i}",
+        "title": f"Problem {i}",
+        "difficulty": "Easy",
+        "tags": ["Array"],
+        "statement": f"Statement {i}",
+        "editorial": None,
+        "url": f"https://leetcode.com/problems/p-{i}/",
+        "statement_hash": f"s{i}",
+        "editorial_hash": f"e{i}",
+    }
+    for i in range(1, 4)
+]
+
+
+class _Cursor:
+    def __init__(self, rows: list[dict]) -> None:
+        self._rows = rows
+
+    async def fetch(self, n: int) -> list[dict]:
+        rows, self._rows = self._rows[:n], self._rows[n:]
+        return rows
+
+
+class _Conn:
+    def __init__(self) -> None:
+        self.copied: list[tuple] = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def cursor(self, query: str) -> _Cursor:
+        return _Cursor(list(PROBLEMS))
+
+    async def execute(self, query: str, *args) -> None:
+        pass
+
+    async def copy_records_to_table(self, table: str, records, columns: list[str]):
+        self.copied += [r async for r in records]
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.conn = _Conn()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+def pool(monkeypatch) -> _Pool:
+    async def rebuild_facets(conn):
+        pass
+
+    pool = _Pool()
+    monkeypatch.setattr(db, "pg_pool", pool)
+    monkeypatch.setattr(db, "VECTOR_DIM", DIM)
+    monkeypatch.setattr(db, "rebuild_facets", rebuild_facets)
+    return pool
+
+
+def _source(tmp_path) -> LocalIndex:
+    index = LocalIndex(tmp_path / "source", DIM)
+    vectors = np.random.default_rng(0).random((5, DIM), dtype=np.float32)
+    index.append(
+        [f"pt-{i}" for i in range(5)],
+        vectors,
+        [{"problem_id": 1 + i % 3, "chunk_type": "statement"} for i in range(5)],
+    )
+    # Retired rows stay in the log but must not be exported.
+    index.append(["pt-5"], vectors[:1], [{"problem_id": 1}], replace=1)
+    return index
+
+
+def _points(index: LocalIndex) -> tuple[dict[str, dict], np.ndarray]:
+    rows = sorted(index.live_rows(), key=index.point_id)
+    payloads = {index.point_id(r): index.payload(r) for r in rows}
+    return payloads, np.stack([index.vector(r) for r in rows])
+
+
+async def test_round_trip(pool, monkeypatch, tmp_path):
+    source = _source(tmp_path)
+    monkeypatch.setattr(db, "local_index", source)
+    path = str(tmp_path / "snap.zip")
+    manifest = await snapshot.export_snapshot(path)
+    assert manifest["problems"] == 3
+    assert manifest["points"] == len(source) == 4
+
+    target = LocalIndex(tmp_path / "target", DIM)
+    monkeypatch.setattr(db, "local_index", target)
+    assert await snapshot.import_snapshot(path) == manifest
+    payloads, vectors = _points(target)
+    source_payloads, source_vectors = _points(source)
+    assert payloads == source_payloads
+    # append() renormalizes, which can move the last bit.
+    np.testing.assert_allclose(vectors, source_vectors, rtol=1e-6)
+    assert pool.conn.copied == [
+        tuple(p[c] for c in snapshot.PROBLEM_COLUMNS) for p in PROBLEMS
+    ]
+
+    # Re-importing skips ids the index already holds.
+    await snapshot.import_snapshot(path)
+    assert len(target) == 4
+    assert len(target._payloads) == 4
+
+
+async def test_import_rejects_other_dim(pool, monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "local_index", _source(tmp_path))
+    path = str(tmp_path / "snap.zip")
+    await snapshot.export_snapshot(path)
+    monkeypatch.setattr(db, "VECTOR_DIM", DIM * 2)
+    with pytest.raises(snapshot.SnapshotError, match="dim"):
+        await snapshot.import_snapshot(path)
+
+
+@pytest.fixture
+def fast_switching():
+    # Switch threads often enough for an unlocked refresh to interleave.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_refreshes(tmp_path, fast_switching):
+    writer = LocalIndex(tmp_path, DIM)
+    reader = LocalIndex(tmp_path, DIM)
+    batches, size = 50, 20
+    stop = threading.Event()
+    errors: list[Exception] = []
+
+    def refresh():
+        while not stop.is_set():
+            try:
+                reader.refresh()
+                reader.search([1.0, 0.0, 0.0, 0.0], limit=5)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=refresh) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for b in range(batches):
+        writer.append(
+            [f"{b}-{i}" for i in range(size)],
+            np.ones((size, DIM), dtype=np.float32),
+            [{"problem_id": b} for _ in range(size)],
+        )
+    stop.set()
+    for t in threads:
+        t.join()
+    assert errors == []
+    reader.refresh()
+    assert len(reader) == len(reader._payloads) == batches * size
+    assert len(reader._vectors) == batches * size
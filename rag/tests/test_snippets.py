@@ -0,0 +1,28 @@
+from src.snippets import query_terms, query_window
+
+
+def test_query_terms_skip_short_words():
+    assert query_terms("Find a Two-Sum in it") == {"find", "two", "sum"}
+
+
+def test_short_text_is_returned_whole():
+    assert query_window("short text", "anything", size=50) == "short text"
+
+
+def test_no_match_falls_back_to_prefix():
+    text = "a" * 100
+    assert query_window(text, "graph", size=10) == "a" * 10
+
+
+def test_window_covers_densest_matches():
+    text = "graph " + "filler " * 40 + "heap heap heap " + "filler " * 40
+    window = query_window(text, "heap", size=40)
+    assert len(window) == 40
+    assert window.count("heap") == 3
+
+
+def test_window_stays_inside_text():
+    text = "filler " * 40 + "heap"
+    window = query_window(text, "heap", size=30)
+    assert len(window) == 30
+    assert window.endswith("heap")
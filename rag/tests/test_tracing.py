@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src import tracing
+from src.config import get_settings
+from src.tracing import TimedRoute, TimingMiddleware, span
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.router.route_class = TimedRoute
+    app.add_middleware(TimingMiddleware)  # ty: ignore[invalid-argument-type]
+
+    @app.get("/async")
+    async def async_endpoint():
+        with span("work"):
+            pass
+        return {"thread": threading.get_ident()}
+
+    @app.get("/sync")
+    def sync_endpoint():
+        with span("work"):
+            pass
+        return {"thread": threading.get_ident()}
+
+    return app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(_app())
+
+
+def _spans(header: str) -> list[str]:
+    return [part.split(";")[0] for part in header.split(", ")]
+
+
+@pytest.mark.parametrize(
+    ("path", "headers"),
+    [
+        ("/async", {"X-Timing": "1"}),
+        ("/async?timing=1", {}),
+        ("/sync", {"X-Timing": "1"}),
+    ],
+)
+def test_server_timing(client, path, headers):
+    resp = client.get(path, headers=headers)
+    assert resp.status_code == 200
+    header = resp.headers["server-timing"]
+    assert _spans(header) == ["work", "serialize", "total"]
+    assert all(";dur=" in part for part in header.split(", "))
+
+
+def test_no_timing_unless_asked(client):
+    resp = client.get("/async", headers={"X-Timing": "0"})
+    assert "server-timing" not in resp.headers
+
+
+def test_sync_endpoint_runs_in_threadpool(client):
+    loop_thread = client.get("/async").json()["thread"]
+    assert client.get("/sync").json()["thread"] != loop_thread
+
+
+@pytest.fixture
+def admin(monkeypatch, tmp_path) -> dict[str, str]:
+    monkeypatch.setattr(get_settings(), "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(get_settings(), "PROFILE_DIR", str(tmp_path))
+    return {"X-Profile": "1", "X-Admin-Token": "secret"}
+
+
+def test_profile_saved(client, admin, tmp_path):
+    resp = client.get("/async", headers=admin)
+    name = resp.headers["x-profile"]
+    assert (tmp_path / name).is_file()
+    assert "total" in _spans(resp.headers["server-timing"])
+    assert not tracing._profiling
+
+
+def test_profile_needs_admin_token(client, admin, monkeypatch):
+    resp = client.get("/async", headers={**admin, "X-Admin-Token": "wrong"})
+    assert "x-profile" not in resp.headers
+    monkeypatch.setattr(get_settings(), "ADMIN_TOKEN", None)
+    resp = client.get("/async", headers=admin)
+    assert "x-profile" not in resp.headers
+
+
+def test_one_profile_at_a_time(client, admin, monkeypatch):
+    # Another request of this worker is being profiled.
+    monkeypatch.setattr(tracing, "_profiling", True)
+    resp = client.get("/async", headers=admin)
+    assert resp.status_code == 200
+    assert "x-profile" not in resp.headers
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import time
+from collections import OrderedDict
 
 import httpx
 from textual import work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
-from textual.widgets import DataTable, Footer, Header, LoadingIndicator, Static
+from textual.containers import Horizontal
+from textual.widgets import DataTable, Footer, Header, Input, LoadingIndicator, Select, Static
 
 RAG_URL = os.environ.get("RAG_URL", "http://localhost:8000")
 LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
 LIST_BATCH = 100
 
+# Search waits for a pause in typing, then never fires more than ~3 requests/s.
+SEARCH_DEBOUNCE = 0.3
+SEARCH_MIN_INTERVAL = 0.34
+SEARCH_MIN_CHARS = 2
+SEARCH_LIMIT = 20
+SEARCH_CACHE_SIZE = 32
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+CHUNK_TYPES = ("statement", "editorial")
+
 STATUS_LOADED = "[green]\u2713[/green]"
 STATUS_LOADING = "[yellow]\u27f3[/yellow]"
 STATUS_ERROR = "[red]\u2717[/red]"
@@ -22,6 +36,8 @@ COL_ID = "id"
 COL_TITLE = "title"
 COL_DIFFICULTY = "difficulty"
 COL_TAGS = "tags"
+COL_SCORE = "score"
+COL_SNIPPET = "snippet"
 
 QUESTION_LIST_QUERY = """
 query($limit: Int, $skip: Int) {
@@ -45,6 +61,22 @@ class ProblemLoaderApp(App):
     DataTable {
         height: 1fr;
     }
+    #search-bar {
+        height: auto;
+    }
+    #search {
+        width: 2fr;
+    }
+    #tags {
+        width: 1fr;
+    }
+    #difficulty, #chunk-type {
+        width: 20;
+    }
+    #search-status {
+        height: 1;
+        padding: 0 1;
+    }
     LoadingIndicator {
         height: 3;
     }
@@ -59,6 +91,8 @@ class ProblemLoaderApp(App):
     BINDINGS = [
         Binding("q", "quit", "Quit"),
         Binding("r", "refresh", "Refresh", show=True),
+        Binding("slash", "focus_search", "Search"),
+        Binding("escape", "focus_problems", "Problems", show=False),
     ]
 
     def __init__(self) -> None:
@@ -66,16 +100,40 @@ class ProblemLoaderApp(App):
         self._problems: list[dict] = []
         self._loaded_slugs: set[str] = set()
         self._loading_slugs: set[str] = set()
+        # One pooled client for every RAG call, so searches reuse keep-alive connections.
+        self._rag = httpx.AsyncClient(
+            base_url=RAG_URL,
+            timeout=30,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+        )
+        self._search_cache: OrderedDict[tuple, list[dict]] = OrderedDict()
+        self._last_search = 0.0
 
     def compose(self) -> ComposeResult:
         yield Header()
+        with Horizontal(id="search-bar"):
+            yield Input(placeholder="Search problems (/)", id="search")
+            yield Select([(d, d) for d in DIFFICULTIES], prompt="Difficulty", id="difficulty")
+            yield Input(placeholder="Tags, comma-separated", id="tags")
+            yield Select([(c.capitalize(), c) for c in CHUNK_TYPES], prompt="Chunk type", id="chunk-type")
+        yield Static(id="search-status")
+        yield DataTable(cursor_type="row", id="results")
         yield LoadingIndicator()
-        yield DataTable(cursor_type="row")
+        yield DataTable(cursor_type="row", id="problems")
         yield Static(f"RAG: {RAG_URL}", id="rag-url")
         yield Footer()
 
     def on_mount(self) -> None:
-        table = self.query_one(DataTable)
+        results = self.query_one("#results", DataTable)
+        results.add_column("Score", key=COL_SCORE, width=6)
+        results.add_column("ID", key=COL_ID, width=6)
+        results.add_column("Title", key=COL_TITLE, width=40)
+        results.add_column("Difficulty", key=COL_DIFFICULTY, width=10)
+        results.add_column("Snippet", key=COL_SNIPPET)
+        results.display = False
+        self.query_one("#search-status").display = False
+
+        table = self.query_one("#problems", DataTable)
         table.add_column("Status", key=COL_STATUS, width=8)
         table.add_column("ID", key=COL_ID, width=8)
         table.add_column("Title", key=COL_TITLE)
@@ -88,7 +146,7 @@ class ProblemLoaderApp(App):
     async def _fetch_data(self) -> None:
         async with httpx.AsyncClient(timeout=30) as client:
             problems = await self._fetch_all_problems(client)
-            loaded_slugs = await self._fetch_loaded_slugs(client)
+        loaded_slugs = await self._fetch_loaded_slugs()
 
         self._problems = problems
         self._loaded_slugs = set(loaded_slugs)
@@ -132,9 +190,9 @@ class ProblemLoaderApp(App):
         problems.sort(key=lambda p: int(p["id"]))
         return problems
 
-    async def _fetch_loaded_slugs(self, client: httpx.AsyncClient) -> list[str]:
+    async def _fetch_loaded_slugs(self) -> list[str]:
         try:
-            resp = await client.get(f"{RAG_URL}/problems/slugs")
+            resp = await self._rag.get("/problems/slugs")
             resp.raise_for_status()
             return resp.json()
         except Exception:
@@ -142,7 +200,7 @@ class ProblemLoaderApp(App):
 
     def _rebuild_table(self) -> None:
         self.query_one(LoadingIndicator).display = False
-        table = self.query_one(DataTable)
+        table = self.query_one("#problems", DataTable)
         table.display = True
         table.clear()
 
@@ -167,6 +225,9 @@ class ProblemLoaderApp(App):
         table.focus()
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        if event.data_table.id == "results":
+            self._show_problem(str(event.row_key.value))
+            return
         slug = str(event.row_key.value)
 
         if slug in self._loaded_slugs or slug in self._loading_slugs:
@@ -179,12 +240,8 @@ class ProblemLoaderApp(App):
     @work(thread=False)
     async def _do_load_problem(self, slug: str) -> None:
         try:
-            async with httpx.AsyncClient(timeout=120) as client:
-                response = await client.post(
-                    f"{RAG_URL}/problems/load",
-                    json={"slug": slug},
-                )
-                response.raise_for_status()
+            response = await self._rag.post("/problems/load", json={"slug": slug}, timeout=120)
+            response.raise_for_status()
             self._loading_slugs.discard(slug)
             self._loaded_slugs.add(slug)
             self._update_row_status(slug, STATUS_LOADED)
@@ -194,17 +251,133 @@ class ProblemLoaderApp(App):
             self._update_row_status(slug, STATUS_ERROR)
 
     def _update_row_status(self, slug: str, status: str) -> None:
-        table = self.query_one(DataTable)
+        table = self.query_one("#problems", DataTable)
         table.update_cell(slug, COL_STATUS, status)
 
+    # ── Search ──
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self._schedule_search()
+
+    def on_select_changed(self, event: Select.Changed) -> None:
+        self._schedule_search()
+
+    def _search_request(self) -> dict | None:
+        query = self.query_one("#search", Input).value.strip()
+        if len(query) < SEARCH_MIN_CHARS:
+            return None
+        request: dict = {"query": query, "limit": SEARCH_LIMIT}
+        difficulty = self.query_one("#difficulty", Select).value
+        if difficulty != Select.BLANK:
+            request["difficulty"] = difficulty
+        tags = [t.strip() for t in self.query_one("#tags", Input).value.split(",") if t.strip()]
+        if tags:
+            request["tags"] = tags
+        chunk_type = self.query_one("#chunk-type", Select).value
+        if chunk_type != Select.BLANK:
+            request["chunk_type"] = chunk_type
+        return request
+
+    def _schedule_search(self) -> None:
+        request = self._search_request()
+        if request is None:
+            self.workers.cancel_group(self, "search")
+            self._show_results(None)
+            return
+        key = (
+            request["query"].lower(),
+            request.get("difficulty"),
+            tuple(request.get("tags", ())),
+            request.get("chunk_type"),
+        )
+        hits = self._search_cache.get(key)
+        if hits is not None:
+            self.workers.cancel_group(self, "search")
+            self._search_cache.move_to_end(key)
+            self._show_results(hits, "cached")
+            return
+        self._set_search_status("Searching\u2026")
+        self._search(request, key)
+
+    # Exclusive: each keystroke cancels the previous worker, whether it is still
+    # debouncing or already waiting on the response.
+    @work(exclusive=True, group="search")
+    async def _search(self, request: dict, key: tuple) -> None:
+        await asyncio.sleep(SEARCH_DEBOUNCE)
+        wait = self._last_search + SEARCH_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_search = time.monotonic()
+        try:
+            resp = await self._rag.post("/search", json=request)
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            self._set_search_status(f"[red]Search failed: HTTP {e.response.status_code}[/red]")
+            return
+        except httpx.HTTPError as e:
+            self._set_search_status(f"[red]Search failed: {e.__class__.__name__}[/red]")
+            return
+        hits = resp.json()
+        if resp.headers.get("X-Search-Mode") == "lexical":
+            # Degraded full-text results; not cached so the next search retries semantic.
+            self._show_results(hits, "lexical fallback")
+            return
+        self._search_cache[key] = hits
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        self._show_results(hits)
+
+    def _set_search_status(self, text: str) -> None:
+        status = self.query_one("#search-status", Static)
+        status.update(text)
+        status.display = True
+
+    def _show_results(self, hits: list[dict] | None, note: str = "") -> None:
+        results = self.query_one("#results", DataTable)
+        results.clear()
+        if hits is None:
+            results.display = False
+            self.query_one("#search-status").display = False
+            return
+        for i, hit in enumerate(hits):
+            results.add_row(
+                f"{hit['score']:.2f}",
+                str(hit["problem_id"]),
+                hit["title"],
+                hit["difficulty"],
+                " ".join(hit["snippet"].split()),
+                key=f"{i}:{hit['problem_id']}",
+            )
+        results.display = True
+        summary = f"{len(hits)} results"
+        self._set_search_status(f"{summary} ({note})" if note else summary)
+
+    def _show_problem(self, result_key: str) -> None:
+        problem_id = result_key.split(":", 1)[1]
+        table = self.query_one("#problems", DataTable)
+        for index, problem in enumerate(self._problems):
+            if problem["id"] == problem_id:
+                table.move_cursor(row=index)
+                table.focus()
+                return
+
+    def action_focus_search(self) -> None:
+        self.query_one("#search", Input).focus()
+
+    def action_focus_problems(self) -> None:
+        self.query_one("#problems", DataTable).focus()
+
     def action_refresh(self) -> None:
         self.query_one(LoadingIndicator).display = True
-        self.query_one(DataTable).display = False
+        self.query_one("#problems", DataTable).display = False
         self._fetch_data()
 
     def action_quit(self) -> None:
         self.exit()
 
+    async def on_unmount(self) -> None:
+        await self._rag.aclose()
+
 
 def main():
     app = ProblemLoaderApp()